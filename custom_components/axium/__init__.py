@@ -1,34 +1,166 @@
 from __future__ import annotations
+import asyncio
 import logging
-from homeassistant.core import HomeAssistant
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_extract_entity_ids
 
-from .const import DOMAIN
+from .const import (
+    CONF_COMMAND_TIMEOUT,
+    CONF_HTTP_CONNECTIONS,
+    CONF_LONGPOLL_IDLE_TIMEOUT,
+    CONF_PUBLISH_DEBOUNCE,
+    DOMAIN,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_HTTP_CONNECTIONS,
+    DEFAULT_LONGPOLL_IDLE_TIMEOUT,
+    DEFAULT_PUBLISH_DEBOUNCE,
+    SERVICE_APPLY_SCENE,
+    SERVICE_EXPORT_RECENT_FRAMES,
+    SERVICE_RAMP_VOLUME,
+    SERVICE_REFRESH_METADATA,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_RECORDING,
+)
 from .coordinator import AxiumCoordinator
+from .hub import async_get_hub
 
 _LOGGER = logging.getLogger(__name__)
-PLATFORMS: list[Platform] = [Platform.SWITCH, Platform.NUMBER, Platform.MEDIA_PLAYER]
+PLATFORMS: list[Platform] = [Platform.SWITCH, Platform.NUMBER, Platform.MEDIA_PLAYER, Platform.SENSOR, Platform.SELECT]
+SERVICES = (
+    SERVICE_REFRESH_METADATA,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_RECORDING,
+    SERVICE_APPLY_SCENE,
+    SERVICE_RAMP_VOLUME,
+    SERVICE_EXPORT_RECENT_FRAMES,
+)
+
+APPLY_SCENE_SCHEMA = cv.make_entity_service_schema({
+    vol.Optional("power"): cv.boolean,
+    vol.Optional("source"): cv.string,
+    vol.Optional("volume_level"): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+})
+RAMP_VOLUME_SCHEMA = cv.make_entity_service_schema({
+    vol.Required("volume_level"): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+    vol.Required("duration"): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+})
+
+
+def _coordinators(hass: HomeAssistant) -> list[AxiumCoordinator]:
+    return list(async_get_hub(hass).coordinators.values())
+
+
+def _async_register_services(hass: HomeAssistant) -> None:
+    if hass.services.has_service(DOMAIN, SERVICE_REFRESH_METADATA):
+        return
+
+    async def _refresh_metadata(call: ServiceCall) -> None:
+        for coordinator in _coordinators(hass):
+            await coordinator.async_refresh_metadata()
+
+    async def _start_recording(call: ServiceCall) -> None:
+        for coordinator in _coordinators(hass):
+            coordinator.start_recording()
+
+    async def _stop_recording(call: ServiceCall) -> None:
+        for coordinator in _coordinators(hass):
+            await coordinator.async_stop_recording()
+
+    async def _export_recent_frames(call: ServiceCall) -> None:
+        for coordinator in _coordinators(hass):
+            await coordinator.async_export_recent_frames()
+
+    async def _apply_scene(call: ServiceCall) -> None:
+        # One batched POST per amp, amps in parallel
+        targets = async_get_hub(hass).resolve_entities(await async_extract_entity_ids(hass, call))
+        await asyncio.gather(*(
+            coordinator.async_apply_scene(
+                zones,
+                call.data.get("power"),
+                call.data.get("source"),
+                call.data.get("volume_level"),
+            )
+            for coordinator, zones in targets.items()
+        ))
+
+    async def _ramp_volume(call: ServiceCall) -> None:
+        # Starts the fades and returns; each amp's RampEngine runs them
+        targets = async_get_hub(hass).resolve_entities(await async_extract_entity_ids(hass, call))
+        for coordinator, zones in targets.items():
+            coordinator.ramp_volume(zones, call.data["volume_level"], call.data["duration"])
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH_METADATA, _refresh_metadata)
+    hass.services.async_register(DOMAIN, SERVICE_START_RECORDING, _start_recording)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_RECORDING, _stop_recording)
+    hass.services.async_register(DOMAIN, SERVICE_EXPORT_RECENT_FRAMES, _export_recent_frames)
+    hass.services.async_register(DOMAIN, SERVICE_APPLY_SCENE, _apply_scene, schema=APPLY_SCENE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_RAMP_VOLUME, _ramp_volume, schema=RAMP_VOLUME_SCHEMA)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     host: str = entry.data["host"]
     zones: list[int] = entry.data["zones"]
     scan_interval: int = entry.options.get("scan_interval", entry.data.get("scan_interval", 3))
+    publish_debounce: float = entry.options.get(
+        CONF_PUBLISH_DEBOUNCE, entry.data.get(CONF_PUBLISH_DEBOUNCE, DEFAULT_PUBLISH_DEBOUNCE)
+    )
+    idle_timeout: float = entry.options.get(
+        CONF_LONGPOLL_IDLE_TIMEOUT, entry.data.get(CONF_LONGPOLL_IDLE_TIMEOUT, DEFAULT_LONGPOLL_IDLE_TIMEOUT)
+    )
+    command_timeout: float = entry.options.get(
+        CONF_COMMAND_TIMEOUT, entry.data.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT)
+    )
+    http_connections: int = entry.options.get(
+        CONF_HTTP_CONNECTIONS, entry.data.get(CONF_HTTP_CONNECTIONS, DEFAULT_HTTP_CONNECTIONS)
+    )
 
-    session = async_get_clientsession(hass)
-    coordinator = AxiumCoordinator(hass, session, host, zones, scan_interval)
-    await coordinator.async_config_entry_first_refresh()
+    # One coordinator per amp, all scheduled through the shared hub. No shared
+    # HA session: the coordinator's AxiumApi opens a dedicated long-poll
+    # connection and command pool for this amp
+    hub = async_get_hub(hass)
+    coordinator = AxiumCoordinator(
+        hass,
+        None,
+        host,
+        zones,
+        scan_interval,
+        publish_debounce,
+        idle_timeout,
+        command_timeout,
+        http_connections,
+        hub,
+        entry.data.get("unique_prefix", DOMAIN),
+    )
+    hub.add(coordinator)
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        hub.remove(coordinator)
+        await coordinator.async_shutdown()
+        raise
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "coordinator": coordinator,
-        "session": session,
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    _async_register_services(hass)
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-    hass.data[DOMAIN].pop(entry.entry_id, None)
+    data = hass.data[DOMAIN].pop(entry.entry_id, None)
+    if data:
+        async_get_hub(hass).remove(data["coordinator"])
+        await data["coordinator"].async_shutdown()
+    if not hass.data[DOMAIN]:
+        for service in SERVICES:
+            hass.services.async_remove(DOMAIN, service)
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    async_get_hub(hass).forget_metadata(entry.data["host"])
@@ -1,9 +1,32 @@
 from __future__ import annotations
-from typing import Iterable, Optional
+import asyncio
+import time
+from typing import AsyncContextManager, Callable, Collection, Iterable, NamedTuple, Optional
 
 import aiohttp
 
-from .const import HTTP_URL, HEADERS
+from .const import (
+    CMD_PRESETNAME,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_HTTP_CONNECTIONS,
+    DEFAULT_LONGPOLL_IDLE_TIMEOUT,
+    HEADERS,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE,
+    HTTP_URL,
+    PRESET_COUNT,
+)
+from .metrics import ApiMetrics
+from .replay import FrameRing
+
+
+class ApiTimeouts(NamedTuple):
+    """Seconds; built into ClientTimeout objects once per AxiumApi."""
+
+    connect: float = HTTP_CONNECT_TIMEOUT
+    command: float = DEFAULT_COMMAND_TIMEOUT
+    batch: float = DEFAULT_COMMAND_TIMEOUT + 5
+    longpoll_idle: float | None = DEFAULT_LONGPOLL_IDLE_TIMEOUT
 
 
 class AxiumApi:
@@ -14,46 +37,131 @@ class AxiumApi:
     - send_lines(): batch multiple opcodes in one POST
     - request_zone_names(): sends 1BFF (or 1B<zone>) to elicit 1C replies
     - snapshot_burst(..., include_names=True): prepends 1BFF so 1C frames arrive
+    - startup_snapshot(): queries every zone in one (or a few bounded concurrent) POSTs
     - webapp_init(): mimics the web UI's initial multi-command POST to trigger name sweeps
     """
 
-    def __init__(self, session: aiohttp.ClientSession, host: str):
-        self._session = session
+    def __init__(
+        self,
+        session: aiohttp.ClientSession | None,
+        host: str,
+        timeouts: ApiTimeouts = ApiTimeouts(),
+        max_connections: int = DEFAULT_HTTP_CONNECTIONS,
+        limiter: asyncio.Semaphore | None = None,
+    ):
+        # session=None: own a dedicated pair of pools for this amp (see
+        # _sessions()); a passed-in session is shared by both and never closed here
+        self._shared_session = session
+        self._session: aiohttp.ClientSession | None = session
+        self._lp_session: aiohttp.ClientSession | None = session
         self._host = host
         self._url = HTTP_URL.format(host=host)
+        self.max_connections = max(max_connections, 1)
+        self.timeouts = timeouts
+        self._t_command = aiohttp.ClientTimeout(total=timeouts.command, sock_connect=timeouts.connect)
+        self._t_batch = aiohttp.ClientTimeout(total=timeouts.batch, sock_connect=timeouts.connect)
+        self._t_longpoll = aiohttp.ClientTimeout(
+            total=None, sock_connect=timeouts.connect, sock_read=timeouts.longpoll_idle
+        )
+        # Optional cross-amp cap on POSTs in flight (see hub.AxiumHub.request_limit).
+        # Only taken while the amp answers: a POST to an unreachable amp would
+        # hold a shared slot for its whole connect timeout
+        self._limiter = limiter
+        self.reachable = False  # last POST / long-poll open got through to the amp
+        self.metrics = ApiMetrics()
+        # Set by the coordinator: replay.FrameRing that logs every POST payload
+        self.ring: FrameRing | None = None
+
+    def _new_session(self, limit: int, keepalive: float | None) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit,
+            keepalive_timeout=keepalive,
+            force_close=keepalive is None,
+            enable_cleanup_closed=True,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    def _command_session(self) -> aiohttp.ClientSession:
+        if self._shared_session is not None:
+            return self._shared_session
+        if self._session is None or self._session.closed:
+            self._session = self._new_session(self.max_connections, HTTP_KEEPALIVE)
+        return self._session
+
+    def _longpoll_session(self) -> aiohttp.ClientSession:
+        if self._shared_session is not None:
+            return self._shared_session
+        if self._lp_session is None or self._lp_session.closed:
+            # One socket, never reused: each reconnect starts a fresh TCP connection
+            self._lp_session = self._new_session(1, None)
+        return self._lp_session
+
+    async def close(self) -> None:
+        """Close the pools this instance created (a passed-in session is left open)."""
+        if self._shared_session is not None:
+            return
+        for session in (self._session, self._lp_session):
+            if session is not None and not session.closed:
+                await session.close()
+        self._session = self._lp_session = None
+
+    async def _post(self, payload: bytes | str, timeout: aiohttp.ClientTimeout) -> str:
+        if self._limiter is None or not self.reachable:
+            return await self._post_now(payload, timeout)
+        async with self._limiter:
+            return await self._post_now(payload, timeout)
+
+    async def _post_now(self, payload: bytes | str, timeout: aiohttp.ClientTimeout) -> str:
+        """POST to axium.cgi, recording latency, errors and timeouts."""
+        m = self.metrics
+        m.requests += 1
+        if self.ring is not None:
+            self.ring.tx(payload)
+        t0 = time.monotonic()
+        try:
+            async with self._command_session().post(
+                self._url, headers=HEADERS, data=payload, timeout=timeout
+            ) as resp:
+                resp.raise_for_status()
+                text = (await resp.text()).replace("\r", "")
+        except asyncio.TimeoutError:
+            m.timeouts += 1
+            self.reachable = False
+            raise
+        except aiohttp.ClientConnectionError:
+            m.errors += 1
+            self.reachable = False
+            raise
+        except Exception:
+            m.errors += 1
+            raise
+        self.reachable = True
+        m.latency["cgi"].observe(time.monotonic() - t0)
+        return text
 
     async def initial_probe(self) -> str:
         """POST empty body to prompt a snapshot dump (common on many firmwares)."""
-        async with self._session.post(
-            self._url, headers=HEADERS, data=b"", timeout=aiohttp.ClientTimeout(total=15)
-        ) as resp:
-            resp.raise_for_status()
-            return (await resp.text()).replace("\r", "")
+        return await self._post(b"", self._t_command)
 
     async def send(self, code: str) -> str:
         """Send a single opcode line, e.g. '1BFF' or '03C1'."""
-        payload = f"{code}\r\n"
-        async with self._session.post(
-            self._url, headers=HEADERS, data=payload, timeout=aiohttp.ClientTimeout(total=15)
-        ) as resp:
-            resp.raise_for_status()
-            return (await resp.text()).replace("\r", "")
+        return await self._post(f"{code}\r\n", self._t_command)
 
     async def send_lines(self, lines: Iterable[str]) -> str:
         """Send multiple opcode lines in one POST."""
-        payload = "".join(f"{ln}\r\n" for ln in lines)
-        async with self._session.post(
-            self._url, headers=HEADERS, data=payload, timeout=aiohttp.ClientTimeout(total=20)
-        ) as resp:
-            resp.raise_for_status()
-            return (await resp.text()).replace("\r", "")
+        return await self._post("".join(f"{ln}\r\n" for ln in lines), self._t_batch)
 
-    async def snapshot_burst(self, zone_hex: str, include_names: bool = True) -> str:
+    @staticmethod
+    def snapshot_lines(
+        zone_hex: str, include_names: bool = True, skip: Collection[str] = frozenset()
+    ) -> list[str]:
         """
-        Ask the amp for a quick state burst for a zone.
-        include_names=True adds a broadcast 1BFF so we receive 1C zone-name replies.
+        Per-zone state queries used by snapshot_burst() and startup_snapshot().
+        include_names=False drops the 29 source-name query (names served from cache);
+        skip drops opcodes the firmware is known not to answer (see capabilities.py).
         """
-        burst = [
+        lines = [
             f"30{zone_hex}",  # group/options
             f"01{zone_hex}",  # power
             f"02{zone_hex}",  # mute (if supported by firmware)
@@ -63,12 +171,86 @@ class AxiumApi:
             f"3C{zone_hex}",  # model/flags (varies)
             f"0D{zone_hex}",  # max volume
         ]
+        if not include_names:
+            lines.remove(f"29{zone_hex}")
+        if skip:
+            lines = [ln for ln in lines if ln[:2] not in skip]
+        return lines
+
+    @staticmethod
+    def resync_lines(zone_hex: str, include_name: bool = False, include_mute: bool = False) -> list[str]:
+        """
+        Live-state queries for a zone after a long-poll outage (power, source,
+        volume, and mute on firmwares that report it). Names, max volume and
+        group links come from the cache; include_name adds 1B for a zone whose
+        name is still unknown.
+        """
+        lines = [f"01{zone_hex}", f"03{zone_hex}", f"04{zone_hex}"]
+        if include_mute:
+            lines.append(f"02{zone_hex}")
+        if include_name:
+            lines.append(f"1B{zone_hex}")
+        return lines
+
+    async def snapshot_burst(self, zone_hex: str, include_names: bool = True) -> str:
+        """
+        Ask the amp for a quick state burst for a zone.
+        include_names=True adds a broadcast 1BFF so we receive 1C zone-name replies.
+        """
+        burst = self.snapshot_lines(zone_hex)
         if include_names:
             # Request zone names; many models reply with multiple 1C<zone>... lines
             burst.insert(0, "1BFF")
 
         return await self.send_lines(burst)
 
+    async def startup_snapshot(
+        self,
+        zone_hexes: Iterable[str],
+        include_names: bool = True,
+        zones_per_post: int = 0,
+        max_concurrency: int = 1,
+        skip: Collection[str] = frozenset(),
+        gate: Callable[[], AsyncContextManager] | None = None,
+    ) -> list[str]:
+        """
+        Query every zone's state in as few round trips as possible.
+
+        zones_per_post=0 sends all zones in a single POST; otherwise zones are split
+        into chunks of that size, with at most max_concurrency POSTs in flight.
+        The 1BFF name broadcast is sent once (in the first chunk), not per zone;
+        include_names=False skips it and the per-zone 29 source-name queries;
+        skip is passed through to snapshot_lines(); gate, if given, is entered
+        around each POST (see hub.AxiumHub.startup_slot).
+        Returns the response text of each chunk that succeeded; raises only if all failed.
+        """
+        zone_hexes = list(zone_hexes)
+        size = zones_per_post if zones_per_post > 0 else max(len(zone_hexes), 1)
+        chunks: list[list[str]] = []
+        for i in range(0, len(zone_hexes), size):
+            chunk = [ln for zh in zone_hexes[i:i + size] for ln in self.snapshot_lines(zh, include_names, skip)]
+            chunks.append(chunk)
+        if include_names:
+            if chunks:
+                chunks[0].insert(0, "1BFF")
+            else:
+                chunks.append(["1BFF"])
+
+        sem = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def _post(lines: list[str]) -> str:
+            async with sem:
+                if gate is None:
+                    return await self.send_lines(lines)
+                async with gate():
+                    return await self.send_lines(lines)
+
+        results = await asyncio.gather(*(_post(c) for c in chunks), return_exceptions=True)
+        texts = [r for r in results if isinstance(r, str)]
+        if results and not texts:
+            raise results[0]
+        return texts
+
     async def request_zone_names(self, zone_hex: Optional[str] = None) -> str:
         """
         Request zone-name replies (1C frames).
@@ -78,27 +260,54 @@ class AxiumApi:
         target = "FF" if zone_hex in (None, "FF") else zone_hex
         return await self.send(f"1B{target}")
 
-    async def webapp_init(self) -> str:
+    @staticmethod
+    def preset_name_lines() -> list[str]:
+        # Web app numbering: preset 1..14 is sent as preset+1 in 0x2B
+        return [f"{CMD_PRESETNAME}FF{preset + 1:02X}" for preset in range(1, PRESET_COUNT + 1)]
+
+    async def request_preset_names(self) -> str:
+        """Preset-name replies (2A frames) for every preset, in one POST."""
+        return await self.send_lines(self.preset_name_lines())
+
+    async def webapp_init(self, include_presets: bool = True) -> str:
         """
         Mimic the web UI's initial POST sequence to trigger zone/preset name sweeps:
 
           14FF06           (query settings / kick names)
           30FF20           (zone linking snapshot)
-          2BFF02..2BFF0F   (request preset names)
+          2BFF02..2BFF0F   (request preset names; skipped if include_presets=False)
           38FF             (refresh)
         """
         lines = ["14FF06", "30FF20"]
-        for preset in range(1, 15):           # presets 1..14
-            param = preset + 1                # web app uses preset+1 in 0x2B
-            lines.append(f"2BFF{param:02X}")
+        if include_presets:
+            lines += self.preset_name_lines()
         lines.append("38FF")
         return await self.send_lines(lines)
 
+    async def request_metadata(self, zone_hexes: Iterable[str]) -> str:
+        """Zone names (1BFF) plus per-zone source names (29) in one POST."""
+        return await self.send_lines(["1BFF"] + [f"29{zh}" for zh in zone_hexes])
+
     async def open_longpoll(self) -> aiohttp.ClientResponse:
         """
         Open the long-poll stream (axiumlong.cgi). Caller must iterate chunks and release resp.
+        timeouts.longpoll_idle bounds the gap between reads; a stalled stream raises
+        asyncio.TimeoutError from the chunk iterator instead of hanging.
         """
         url = self._url.replace("/axium.cgi", "/axiumlong.cgi")
-        resp = await self._session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=None))
-        resp.raise_for_status()
+        m = self.metrics
+        m.requests += 1
+        t0 = time.monotonic()
+        try:
+            resp = await self._longpoll_session().get(url, headers=HEADERS, timeout=self._t_longpoll)
+            resp.raise_for_status()
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+            m.errors += 1
+            self.reachable = False
+            raise
+        except Exception:
+            m.errors += 1
+            raise
+        self.reachable = True
+        m.latency["longpoll"].observe(time.monotonic() - t0)
         return resp
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import time
+from typing import Any, Iterable, Mapping, NamedTuple
+
+from .protocol import ModelFrame, parse_frame, split_frames
+
+# Snapshot queries that only some firmwares answer: 02 mute, 29 source names, 3C model/flags
+OPTIONAL_QUERY_OPCODES = frozenset({"02", "29", "3C"})
+
+
+class Capabilities(NamedTuple):
+    """
+    What one amp's firmware answers, learned from its snapshot replies.
+
+    probed: optional query opcodes that have been sent at least once
+    supported: the probed opcodes that got a reply
+    An opcode not yet probed is neither; it keeps being sent until it is.
+    """
+    probed: frozenset[str] = frozenset()
+    supported: frozenset[str] = frozenset()
+    model: str | None = None  # raw 3C data, when the amp reports it
+    probed_at: float | None = None
+
+    @property
+    def unsupported(self) -> frozenset[str]:
+        return self.probed - self.supported
+
+    @property
+    def complete(self) -> bool:
+        return OPTIONAL_QUERY_OPCODES <= self.probed
+
+    def supports(self, opcode: str) -> bool:
+        return opcode in self.supported
+
+    def merge_replies(self, sent: Iterable[str], texts: Iterable[str], complete: bool = True) -> Capabilities:
+        """
+        Fold in one probe: the query opcodes sent and the reply texts they produced.
+        complete=False (some replies were lost) only records the opcodes that answered.
+        """
+        sent = OPTIONAL_QUERY_OPCODES.intersection(sent)
+        answered: set[str] = set()
+        model = self.model
+        for text in texts:
+            for line in split_frames(text):
+                op = line[:2]
+                if op in sent:
+                    answered.add(op)
+                if op == "3C" and model is None:
+                    frame = parse_frame(line)
+                    if isinstance(frame, ModelFrame):
+                        model = frame.data
+        if not complete:
+            sent = answered
+        return Capabilities(
+            probed=self.probed | sent,
+            supported=(self.supported - sent) | answered,
+            model=model,
+            probed_at=time.time(),
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "probed": sorted(self.probed),
+            "supported": sorted(self.supported),
+            "model": self.model,
+            "probed_at": self.probed_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any] | None) -> Capabilities | None:
+        if not data:
+            return None
+        return cls(
+            probed=frozenset(data.get("probed", ())),
+            supported=frozenset(data.get("supported", ())),
+            model=data.get("model"),
+            probed_at=data.get("probed_at"),
+        )
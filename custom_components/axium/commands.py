@@ -0,0 +1,155 @@
+from __future__ import annotations
+import asyncio
+from typing import Callable
+from .api import AxiumApi
+
+# Setter opcodes where only the newest value per zone matters (power, mute, source, volume)
+COALESCE_OPCODES = frozenset({"01", "02", "03", "04"})
+
+
+class _Pending:
+    __slots__ = ("line", "waiters", "group")
+
+    def __init__(self, line: str, waiter: asyncio.Future):
+        self.line = line
+        self.waiters = [waiter]
+        self.group: tuple[str, ...] | None = None  # slots that must share one POST
+
+
+class CommandQueue:
+    """
+    Latest-wins outgoing command pipeline in front of AxiumApi.
+
+    Each (opcode, zone) for the setter opcodes has one pending slot: a newer
+    command replaces the queued value, so dragging a slider sends only the
+    values the amp has time for. Pending commands are flushed together as one
+    send_lines() batch with at most max_in_flight POSTs outstanding. A slot whose
+    previous value is still in flight waits for that POST to finish, so two values
+    for the same slot never race and the amp always ends on the newest one.
+    """
+
+    def __init__(
+        self,
+        api: AxiumApi,
+        max_in_flight: int = 1,
+        max_batch: int = 32,
+        on_response: Callable[[str], None] | None = None,
+    ):
+        self._api = api
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_batch = max(max_batch, 1)
+        self.on_response = on_response  # fed every reply so it updates state at once
+        self._pending: dict[str, _Pending] = {}
+        self._in_flight_keys: set[str] = set()
+        self._tasks: dict[asyncio.Task, list[tuple[str, _Pending]]] = {}  # in-flight POST -> its batch
+        self.sent = 0        # lines actually POSTed
+        self.coalesced = 0   # lines replaced by a newer value before sending
+
+    @staticmethod
+    def slot_key(line: str) -> str:
+        return line[:4] if line[:2] in COALESCE_OPCODES else line
+
+    async def submit(self, line: str) -> str:
+        """
+        Queue a command line; resolves with the amp's response text once the
+        batch carrying it (or the newer value that replaced it) has been sent.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        key = self.slot_key(line)
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = _Pending(line, fut)
+        else:
+            entry.line = line
+            entry.waiters.append(fut)
+            self.coalesced += 1
+        self._kick()
+        return await fut
+
+    async def submit_many(self, lines: list[str]) -> str:
+        """
+        Queue several command lines that must go out together in one POST
+        (not split by max_batch), e.g. a scene. Each line still takes over its
+        slot, so older queued values for the same zone/opcode are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        futs = []
+        keys = tuple(dict.fromkeys(self.slot_key(ln) for ln in lines))
+        for line in lines:
+            fut = loop.create_future()
+            key = self.slot_key(line)
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = _Pending(line, fut)
+            else:
+                entry.line = line
+                entry.waiters.append(fut)
+                self.coalesced += 1
+            entry.group = keys
+            futs.append(fut)
+        self._kick()
+        results = await asyncio.gather(*futs)
+        return results[0] if results else ""
+
+    def _kick(self):
+        while self._pending and len(self._tasks) < self.max_in_flight:
+            batch: list[tuple[str, _Pending]] = []
+            taken: set[str] = set()
+            for key, entry in self._pending.items():
+                if key in taken or key in self._in_flight_keys:
+                    continue
+                group = entry.group
+                if group is None:
+                    batch.append((key, entry))
+                    taken.add(key)
+                elif not any(k in self._in_flight_keys for k in group):
+                    # Whole group or nothing, even past max_batch
+                    batch.extend((k, self._pending[k]) for k in group if k not in taken and k in self._pending)
+                    taken.update(group)
+                if len(batch) >= self.max_batch:
+                    break
+            if not batch:
+                return
+            for key, _ in batch:
+                del self._pending[key]
+                self._in_flight_keys.add(key)
+            self._tasks[asyncio.get_running_loop().create_task(self._send(batch))] = batch
+
+    async def _send(self, batch: list[tuple[str, _Pending]]):
+        waiters = [w for _, entry in batch for w in entry.waiters]
+        try:
+            text = await self._api.send_lines([entry.line for _, entry in batch])
+        except asyncio.CancelledError:
+            for w in waiters:
+                w.cancel()
+            raise
+        except Exception as e:
+            for w in waiters:
+                if not w.done():
+                    w.set_exception(e)
+        else:
+            self.sent += len(batch)
+            if self.on_response is not None:
+                self.on_response(text)
+            for w in waiters:
+                if not w.done():
+                    w.set_result(text)
+        finally:
+            for key, _ in batch:
+                self._in_flight_keys.discard(key)
+            self._tasks.pop(asyncio.current_task(), None)
+            # Drain whatever queued up while this POST was out
+            self._kick()
+
+    def close(self):
+        # Waiters of in-flight batches are cancelled here too: a task cancelled
+        # before it first runs never reaches _send()'s handlers
+        entries = [entry for batch in self._tasks.values() for _, entry in batch]
+        entries.extend(self._pending.values())
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+        self._pending.clear()
+        for entry in entries:
+            for w in entry.waiters:
+                w.cancel()
@@ -3,7 +3,15 @@ from typing import Any
 from homeassistant import config_entries
 import voluptuous as vol
 
-from .const import DOMAIN, DEFAULT_ZONES, DEFAULT_SCAN_INTERVAL
+from .const import (
+    DOMAIN,
+    DEFAULT_ZONES,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_PUBLISH_DEBOUNCE,
+    DEFAULT_LONGPOLL_IDLE_TIMEOUT,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_HTTP_CONNECTIONS,
+)
 
 class AxiumConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -12,16 +20,38 @@ class AxiumConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             zones_str: str = user_input["zones"]
             zones = [int(z.strip()) for z in zones_str.split(',') if z.strip()]
+            await self.async_set_unique_id(user_input["host"])
+            self._abort_if_unique_id_configured()
+            # The first amp keeps the original "axium_z<n>" entity ids; further amps
+            # in the hub are prefixed with their host so ids don't collide
+            others = self._async_current_entries(include_ignore=False)
             data = {
                 "host": user_input["host"],
                 "zones": zones,
                 "scan_interval": user_input["scan_interval"],
+                "publish_debounce": user_input.get("publish_debounce", DEFAULT_PUBLISH_DEBOUNCE),
+                "longpoll_idle_timeout": user_input.get("longpoll_idle_timeout", DEFAULT_LONGPOLL_IDLE_TIMEOUT),
+                "command_timeout": user_input.get("command_timeout", DEFAULT_COMMAND_TIMEOUT),
+                "http_connections": user_input.get("http_connections", DEFAULT_HTTP_CONNECTIONS),
+                "preset_recall": user_input.get("preset_recall", False),
+                "unique_prefix": f"{DOMAIN}_{user_input['host']}" if others else DOMAIN,
             }
             return self.async_create_entry(title=f"Axium {user_input['host']}", data=data)
 
         schema = vol.Schema({
             vol.Required("host"): str,
             vol.Required("zones", default=",".join(map(str, DEFAULT_ZONES))): str,
-            vol.Required("scan_interval", default=DEFAULT_SCAN_INTERVAL): int,
+            vol.Required("scan_interval", default=DEFAULT_SCAN_INTERVAL): vol.All(int, vol.Range(min=1)),
+            vol.Optional("publish_debounce", default=DEFAULT_PUBLISH_DEBOUNCE): vol.Coerce(float),
+            vol.Optional("longpoll_idle_timeout", default=DEFAULT_LONGPOLL_IDLE_TIMEOUT): vol.All(
+                vol.Coerce(float), vol.Range(min=5)
+            ),
+            vol.Optional("command_timeout", default=DEFAULT_COMMAND_TIMEOUT): vol.All(
+                vol.Coerce(float), vol.Range(min=1)
+            ),
+            vol.Optional("http_connections", default=DEFAULT_HTTP_CONNECTIONS): vol.All(
+                int, vol.Range(min=1, max=4)
+            ),
+            vol.Optional("preset_recall", default=False): bool,
         })
         return self.async_show_form(step_id="user", data_schema=schema)
@@ -2,9 +2,68 @@ DOMAIN = "axium"
 CONF_HOST = "host"
 CONF_ZONES = "zones"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_PUBLISH_DEBOUNCE = "publish_debounce"
+CONF_LONGPOLL_IDLE_TIMEOUT = "longpoll_idle_timeout"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_HTTP_CONNECTIONS = "http_connections"
+CONF_PRESET_RECALL = "preset_recall"
 
 DEFAULT_ZONES = [1, 2, 3, 4, 5, 6, 7, 8]
 DEFAULT_SCAN_INTERVAL = 3  # seconds
+DEFAULT_PUBLISH_DEBOUNCE = 0.1  # seconds; coalesces long-poll bursts into one update
+
+# Startup snapshot: zones per POST (0 = all zones in one POST) and max concurrent POSTs
+SNAPSHOT_ZONES_PER_POST = 16
+SNAPSHOT_MAX_CONCURRENCY = 2
+
+# Per-amp HTTP pools: the long-poll gets its own connection; commands and
+# snapshots share a small keep-alive pool (embedded CGI servers cope badly
+# with many concurrent sockets)
+DEFAULT_HTTP_CONNECTIONS = 2  # command pool size
+HTTP_KEEPALIVE = 30  # seconds an idle command connection is kept open
+HTTP_CONNECT_TIMEOUT = 10
+DEFAULT_COMMAND_TIMEOUT = 15  # single-command POST; batches get 5 s more
+
+# Multi-amp hub (hub.py): shared across all config entries
+DATA_HUB = "axium_hub"
+HUB_MAX_IN_FLIGHT = 4  # axium.cgi POSTs in flight across all amps
+HUB_STARTUP_CONCURRENCY = 2  # amps running their startup snapshot at once
+HUB_STARTUP_STAGGER = 0.05  # min seconds between startup snapshot starts
+
+# Outgoing command pipeline: concurrent POSTs and max lines per batch
+COMMAND_MAX_IN_FLIGHT = 1
+COMMAND_MAX_BATCH = 32
+
+# Volume ramps (ramp.py): step interval is RAMP_LATENCY_FACTOR x the recent
+# axium.cgi latency, clamped to [RAMP_MIN_INTERVAL, RAMP_MAX_INTERVAL] seconds
+RAMP_LATENCY_FACTOR = 2
+RAMP_MIN_INTERVAL = 0.1
+RAMP_MAX_INTERVAL = 1.0
+
+# Recent frames / commands kept for diagnostics (replay.FrameRing)
+FRAME_RING_SIZE = 1000
+
+# Long-poll frames are queued for the applier, which handles at most
+# FRAME_BATCH_MAX per event-loop iteration (collapsing superseded frames within
+# each batch); the reader stops reading while FRAME_QUEUE_MAX are waiting
+FRAME_BATCH_MAX = 256
+FRAME_QUEUE_MAX = 4096
+
+# Seconds an optimistic value is shown before rollback if no frame confirms it
+OPTIMISTIC_TIMEOUT = 5
+
+# Persistent zone/source/preset name cache; older entries are revalidated in the
+# background after startup
+STORAGE_VERSION = 1
+METADATA_TTL = 7 * 24 * 3600  # seconds
+METADATA_SAVE_DELAY = 10  # seconds
+
+SERVICE_REFRESH_METADATA = "refresh_metadata"
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+SERVICE_APPLY_SCENE = "apply_scene"
+SERVICE_RAMP_VOLUME = "ramp_volume"
+SERVICE_EXPORT_RECENT_FRAMES = "export_recent_frames"
 
 HTTP_URL = "http://{host}/axium.cgi"
 HEADERS = {"Content-Type": "application/x-axium"}
@@ -18,6 +77,27 @@ CMD_MAXVOL = "0D"
 CMD_SRCNAME = "29"
 CMD_AVAILSRC = "3C"
 CMD_LINKZONES = "30"
+CMD_PRESETNAME = "2B"    # 2B FF {preset + 1}, presets 1..14 as numbered by the web app
+# 2C FF {preset + 1}: inferred from the 2B numbering, not yet confirmed against
+# a real amp, so the recall select is only created when CONF_PRESET_RECALL is on
+CMD_PRESET_RECALL = "2C"
+PRESET_COUNT = 14
 
 STATE_ON = "01"
 STATE_OFF = "00"
+
+# Long-poll watchdog: the amp writes a 38FF keepalive every few seconds on an
+# idle stream, so a read gap longer than this means the connection is dead
+DEFAULT_LONGPOLL_IDLE_TIMEOUT = 15
+LONGPOLL_BACKOFF_MAX = 30
+# Entities go unavailable only if the stream stays down longer than this
+UNAVAILABLE_GRACE = 5
+
+# Polling fallback: once the stream has been down for UNAVAILABLE_GRACE, state is
+# polled (one POST for all zones) until it reconnects. scan_interval is the
+# normal rate; faster for POLL_ACTIVE_WINDOW after a command, slower once
+# nothing has changed for POLL_IDLE_AFTER
+POLL_FAST_INTERVAL = 1
+POLL_ACTIVE_WINDOW = 30
+POLL_IDLE_AFTER = 300
+POLL_IDLE_FACTOR = 4
@@ -1,368 +1,926 @@
 from __future__ import annotations
 import asyncio
+import functools
 import logging
+import math
+import random
+import time
+from collections import deque
+from typing import Callable, Mapping
 from datetime import timedelta
 import aiohttp
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .api import AxiumApi
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import AxiumApi, ApiTimeouts
+from .capabilities import OPTIONAL_QUERY_OPCODES, Capabilities
+from .protocol import (
+    ENCODE_SOURCE_MAP,
+    LineFramer,
+    collapse_frames,
+    encode_zone,
+    frame_text,
+    parse_frame,
+)
+from .commands import CommandQueue
+from .groups import LINK_POWER, LINK_SOURCE, LINK_VOLUME
+from .hub import AxiumHub
+from .metrics import StreamMetrics
+from .ramp import RampEngine
+from .replay import ENDPOINT_CGI, ENDPOINT_LONGPOLL, SUPERSEDED, FrameRecorder, FrameRing, write_trace
+from .state import AxiumState
+from .const import (
+    COMMAND_MAX_BATCH,
+    COMMAND_MAX_IN_FLIGHT,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_HTTP_CONNECTIONS,
+    DEFAULT_LONGPOLL_IDLE_TIMEOUT,
+    CMD_MUTE,
+    CMD_PRESET_RECALL,
+    DEFAULT_PUBLISH_DEBOUNCE,
+    DOMAIN,
+    FRAME_BATCH_MAX,
+    FRAME_QUEUE_MAX,
+    FRAME_RING_SIZE,
+    LONGPOLL_BACKOFF_MAX,
+    METADATA_TTL,
+    OPTIMISTIC_TIMEOUT,
+    POLL_ACTIVE_WINDOW,
+    POLL_FAST_INTERVAL,
+    POLL_IDLE_AFTER,
+    POLL_IDLE_FACTOR,
+    SNAPSHOT_MAX_CONCURRENCY,
+    SNAPSHOT_ZONES_PER_POST,
+    UNAVAILABLE_GRACE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-
-def encode_zone(zone: int) -> str:
-    z = zone
-    if z != 0xFF:
-        if z >= 64:
-            z = 0xC0 + (z - 64)
-        elif z >= 32:
-            z = 0x80 + (z - 32)
-    return f"{z:02X}"
-
-
-def decode_zone(z_hex: str) -> int | None:
-    try:
-        z = int(z_hex, 16)
-    except ValueError:
-        return None
-    if z != 0xFF:
-        z &= ~0x20
-        top = z & 0xC0
-        if top == 0x80:
-            return 32 + (z & 0x1F)
-        if top == 0xC0:
-            return 64 + (z & 0x1F)
-        if top == 0x40:
-            return None
-    return z
-
-
-DECODE_SOURCE_MAP = {0: 4, 1: 5, 2: 6, 3: 3, 4: 7, 5: 0, 6: 1, 7: 2}
-ENCODE_SOURCE_MAP = {v: k for k, v in DECODE_SOURCE_MAP.items()}
+# Optimistic-write field -> the report opcode that confirms it
+_FIELD_OPCODES = {"power": "01", "mute": "02", "source": "03", "volume": "04"}
 
 
 class AxiumCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass: HomeAssistant, session: aiohttp.ClientSession, host: str, zones: list[int], scan_interval: int):
-        # Long-poll only: disable periodic polling by setting update_interval=None
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession | None,
+        host: str,
+        zones: list[int],
+        scan_interval: int,
+        publish_debounce: float = DEFAULT_PUBLISH_DEBOUNCE,
+        longpoll_idle_timeout: float = DEFAULT_LONGPOLL_IDLE_TIMEOUT,
+        command_timeout: float = DEFAULT_COMMAND_TIMEOUT,
+        http_connections: int = DEFAULT_HTTP_CONNECTIONS,
+        hub: AxiumHub | None = None,
+        unique_prefix: str = DOMAIN,
+    ):
+        # Push via the long-poll; update_interval is only set while polling
+        # stands in for a failed stream (see _set_polling)
         super().__init__(hass, _LOGGER, name="axium", update_interval=None)
         self.hass = hass
-        self.api = AxiumApi(session, host)
+        self.host = host
+        # Scheduler / metadata cache shared with the other amps (a private one
+        # when run standalone, e.g. from tools/)
+        self.hub = hub if hub is not None else AxiumHub(hass)
+        # Entity unique-id / device prefix: "axium" for the first amp (the
+        # pre-hub ids), "axium_<host>" for amps added alongside it
+        self.unique_prefix = unique_prefix
+        # session=None gives the amp its own long-poll connection and command pool
+        self.api = AxiumApi(
+            session,
+            host,
+            ApiTimeouts(
+                command=command_timeout,
+                batch=command_timeout + 5,
+                longpoll_idle=longpoll_idle_timeout,
+            ),
+            http_connections,
+            self.hub.request_limit,
+        )
+        self.commands = CommandQueue(
+            self.api,
+            COMMAND_MAX_IN_FLIGHT,
+            COMMAND_MAX_BATCH,
+            on_response=lambda text: self._handle_text(text, "CMD"),
+        )
         self.zones = zones
 
-        # State caches
-        self.power: dict[int, str | None] = {z: None for z in zones}
-        self.volume: dict[int, int | None] = {z: None for z in zones}
-        self.source: dict[int, int | None] = {z: None for z in zones}
-        self.max_vol: dict[int, int | None] = {z: 0xA0 for z in zones}
-        self.source_names: dict[int, dict[int, str]] = {z: {} for z in zones}
-        self.zone_names: dict[int, str] = {}
+        # Zone records, name tables, groups and pending optimistic writes;
+        # entities read the immutable snapshot published as coordinator.data
+        self.state = AxiumState(zones)
+
+        # Volume fades (ramp_volume service), paced by the recent command latency
+        self.ramps = RampEngine(self.state, self.commands, lambda: self.api.metrics.latency["cgi"].recent)
+
+        # Persistent name/group cache (the hub's shared Store); seeded at startup,
+        # revalidated in the background
+        self.metadata_refreshed_at: float | None = None
+        # Which optional queries this amp's firmware answers; probed by the first
+        # startup snapshots, then persisted with the metadata
+        self.capabilities = Capabilities()
+        # Preset names are fetched once something shows them (preset_names_wanted)
+        # and the amp is reachable, retried after each reconnect until a fetch
+        # completes; a completed fetch is cached even if the amp has no names
+        self.preset_names_wanted = False
+        self.preset_names_loaded = False
+        self._preset_task: asyncio.Task | None = None
 
         self._lp_task: asyncio.Task | None = None
 
-        # Group/linking
-        self.zone_group: dict[int, int | None] = {z: None for z in zones}
-        self.group_options: dict[int, int] = {}
-
-    def _linked_peers(self, zone: int) -> list[int]:
-        g = self.zone_group.get(zone)
-        if g is None:
-            return []
-        return [z for z, gz in self.zone_group.items() if gz == g and z != zone]
+        # Long-poll watchdog: a stream silent for longer than the idle timeout
+        # (no frames, not even 38 keepalives) is dropped and reconnected; entities
+        # report unavailable once it has been down for UNAVAILABLE_GRACE
+        self.longpoll_idle_timeout = longpoll_idle_timeout
+        self.connected = False
+        self._unavailable_handle: asyncio.TimerHandle | None = None
+
+        # Polling fallback while the stream is down: one batched query per cycle,
+        # paced by recent activity (see _poll_interval)
+        self.scan_interval = scan_interval
+        self.polling = False
+        self.polls = 0
+        self._last_activity = 0.0  # monotonic time of the last command from HA
+        self._last_change = 0.0  # ... and of the last poll that changed state
+
+        # Zones whose live state may have been missed while the stream was down;
+        # re-queried in one POST once it is back (see _async_resync)
+        self._stale_zones: set[int] = set()
+        self._resync_task: asyncio.Task | None = None
+
+        # Long-poll frames waiting for the applier (see _queue_frames)
+        self._frame_queue: deque[str] = deque()
+        self._frame_queue_space = asyncio.Event()  # set while below FRAME_QUEUE_MAX
+        self._frame_queue_space.set()
+        self._apply_handle: asyncio.Handle | None = None
+
+        # Background startup snapshot (see async_config_entry_first_refresh);
+        # re-run on the next connect until one completes (see _request_hydrate)
+        self._hydrate_task: asyncio.Task | None = None
+        self._hydrate_cached = False
+        self._hydrate_again = False  # reachable again while a failing hydrate ran
+        self.hydrated = False
+
+        # Coalesced publishing: frames from one chunk / tick (plus the debounce
+        # window) produce a single coordinator update
+        self.publish_debounce = publish_debounce
+        self._publish_handle: asyncio.Handle | None = None
+        self.frames_received = 0
+        self.updates_published = 0
+
+        # Fields changed per zone in the latest update (None = everything, e.g.
+        # the initial refresh or an availability change); see AxiumEntity
+        self.dirty_fields: Mapping[int, set[str]] | None = None
+
+        # Long-poll / parser counters (see metrics.py, sensor.py, diagnostics.py)
+        self.metrics = StreamMetrics()
+
+        # Raw response capture for offline replay (see replay.py / tools/replay_bench.py)
+        self.recorder: FrameRecorder | None = None
+
+        # Last FRAME_RING_SIZE frames in / payloads out, for diagnostics
+        self.ring = FrameRing(FRAME_RING_SIZE)
+        self.api.ring = self.ring
+
+        # Seconds spent in each startup phase: cache (in setup), then probe /
+        # webapp_init / snapshot / total from the background hydrate (each
+        # includes the wait for a hub startup slot)
+        self.startup_timings: dict[str, float] = {}
 
     async def _async_update_data(self):
-        # No polling; just return the current cache when HA asks once at startup.
+        if not self.polling:
+            # Only called once at startup: return the current cache
+            self.update_interval = None
+            self.dirty_fields = None
+            return self.state.snapshot()
+        mute = self.capabilities.supports(CMD_MUTE)
+        lines = [ln for z in self.zones for ln in AxiumApi.resync_lines(encode_zone(z), include_mute=mute)]
+        try:
+            text = await self.api.send_lines(lines)
+        except Exception as e:
+            if not self.polling:
+                # The long-poll recovered while this poll was out; it is not a failure
+                _LOGGER.debug("Poll of %s failed after the long-poll recovered: %s", self.host, e)
+                self.dirty_fields = {}
+                return self.state.snapshot()
+            self.dirty_fields = None  # availability changes for every entity
+            raise UpdateFailed(f"Polling {self.host} failed: {e}") from e
+        self.polls += 1
+        self._handle_text(text, "POLL")
+        self._request_hydrate()
+        self.request_preset_names()
+        # Published as this refresh's result rather than via the debounce
+        if self._publish_handle is not None:
+            self._publish_handle.cancel()
+            self._publish_handle = None
+        if self.state.dirty:
+            self._last_change = time.monotonic()
+            self.updates_published += 1
+        self.dirty_fields = self.state.dirty if self.last_update_success else None
+        self.state.dirty = {}
+        # _set_polling(False) may have run while the POST was out: don't re-arm the timer
+        if self.polling:
+            self.update_interval = timedelta(seconds=self._poll_interval())
+        return self.state.snapshot()
+
+    def _note_activity(self) -> None:
+        self._last_activity = time.monotonic()
+        if self.polling and self.update_interval != timedelta(seconds=self._poll_interval()):
+            # Pick up the command's side effects at the fast rate straight away
+            self.update_interval = timedelta(seconds=self._poll_interval())
+            self._schedule_refresh()
+
+    def _poll_interval(self) -> float:
+        # Never poll back to back, whatever an old config entry holds
+        scan_interval = max(self.scan_interval, 1)
+        now = time.monotonic()
+        if self.ramps.active or now - self._last_activity < POLL_ACTIVE_WINDOW:
+            return min(POLL_FAST_INTERVAL, scan_interval)
+        if now - self._last_change < POLL_IDLE_AFTER:
+            return scan_interval
+        return scan_interval * POLL_IDLE_FACTOR
+
+    def _set_polling(self, polling: bool) -> None:
+        if polling == self.polling:
+            return
+        self.polling = polling
+        if polling:
+            _LOGGER.warning("Long-poll to Axium at %s is down; polling until it recovers", self.host)
+            self._last_change = time.monotonic()
+            self.update_interval = timedelta(seconds=self._poll_interval())
+            self.hass.loop.create_task(self.async_refresh())
+        else:
+            _LOGGER.info("Long-poll to Axium at %s recovered; polling stopped", self.host)
+            self.update_interval = None
+            self._unschedule_refresh()
+
+    @property
+    def live(self) -> bool:
+        """True while state is kept current: by the stream, or by polling in its place."""
+        return self.connected or self.polling
+
+    def _schedule_publish(self):
+        if self._publish_handle is not None:
+            return  # already pending; this change rides along with it
+        if self.publish_debounce > 0:
+            self._publish_handle = self.hass.loop.call_later(self.publish_debounce, self._publish)
+        else:
+            self._publish_handle = self.hass.loop.call_soon(self._publish)
+
+    def _publish(self):
+        self._publish_handle = None
+        self.dirty_fields, self.state.dirty = self.state.dirty, {}
+        self.updates_published += 1
+        self.async_set_updated_data(self.state.snapshot())
+
+    def _publish_now(self):
+        """Publish pending changes immediately instead of after the debounce."""
+        if self._publish_handle is not None:
+            self._publish_handle.cancel()
+        if self.state.dirty:
+            self._publish()
+        else:
+            self._publish_handle = None
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected:
+            if self._unavailable_handle is not None:
+                self._unavailable_handle.cancel()
+                self._unavailable_handle = None
+            self._mark_available(True)
+        elif self._unavailable_handle is None and (self.connected or not self.polling):
+            # The grace period runs from the first failure, not the latest retry;
+            # a stream that never connected falls back to polling the same way
+            self._unavailable_handle = self.hass.loop.call_later(
+                UNAVAILABLE_GRACE, self._mark_available, False
+            )
+
+    def _mark_available(self, connected: bool) -> None:
+        self._unavailable_handle = None
+        was_available = self.live and self.last_update_success
+        self.connected = connected
+        self._set_polling(not connected)
+        if connected:
+            self.last_update_success = True  # failed polls no longer matter
+        if (self.live and self.last_update_success) != was_available:
+            # Availability applies to every entity, not just the dirty fields
+            self.dirty_fields = None
+            self.async_update_listeners()
+
+    def diagnostics(self) -> dict:
+        """Counters and timings for the diagnostics download and sensors."""
         return {
-            "power": self.power,
-            "volume": self.volume,
-            "source": self.source,
-            "max_vol": self.max_vol,
-            "source_names": self.source_names,
-            "zone_names": self.zone_names,
+            "frames_received": self.frames_received,
+            "updates_published": self.updates_published,
+            "startup_timings": self.startup_timings,
+            "commands": {"sent": self.commands.sent, "coalesced": self.commands.coalesced},
+            "ramps": {"active": sorted(self.ramps.active), "steps_sent": self.ramps.steps_sent},
+            "http": self.api.metrics.as_dict(),
+            "stream": self.metrics.as_dict(),
+            "connected": self.connected,
+            "polling": {"active": self.polling, "polls": self.polls, "interval": self._poll_interval()},
+            "capabilities": self.capabilities.as_dict(),
         }
 
-    async def async_config_entry_first_refresh(self):
-        # 1) Initial probe (many firmwares dump a snapshot)
+    async def async_shutdown(self) -> None:
+        if self._publish_handle is not None:
+            self._publish_handle.cancel()
+            self._publish_handle = None
+        if self._lp_task is not None:
+            self._lp_task.cancel()
+            self._lp_task = None
+        if self._unavailable_handle is not None:
+            self._unavailable_handle.cancel()
+            self._unavailable_handle = None
+        if self._resync_task is not None:
+            self._resync_task.cancel()
+            self._resync_task = None
+        if self._hydrate_task is not None:
+            self._hydrate_task.cancel()
+            self._hydrate_task = None
+        if self._preset_task is not None:
+            self._preset_task.cancel()
+            self._preset_task = None
+        if self._apply_handle is not None:
+            self._apply_handle.cancel()
+            self._apply_handle = None
+        self._frame_queue.clear()
+        self.ramps.close()
+        self.commands.close()
+        for pend in self.state.pending.values():
+            pend.handle.cancel()
+        self.state.pending.clear()
+        await self.api.close()
+        await super().async_shutdown()
+
+    async def async_send_command(self, line: str, zone: int | None = None, **optimistic) -> None:
+        """
+        Queue a command and optimistically apply its expected effect, e.g.
+        async_send_command("0401A0", 1, volume=0xA0). The amp's reply to the POST
+        is parsed like any other frame; if no frame confirms the value within
+        OPTIMISTIC_TIMEOUT it is rolled back to the last amp-reported value.
+        """
+        self._note_activity()
+        if zone is not None:
+            if "volume" in optimistic:
+                self.ramps.cancel(zone)  # a user change wins over a running fade
+            for field, value in optimistic.items():
+                self._set_optimistic(field, zone, value)
+        try:
+            await self.commands.submit(line)
+        except Exception:
+            for field in optimistic:
+                self._rollback(field, zone)
+            raise
+
+    def source_index(self, zone: int, source: str) -> int | None:
+        """Source index for a label as shown in the UI (name, or "S<n>" when unnamed)."""
+        snap = self.data
+        for i in range(8):
+            if (snap.source_name(zone, i) or f"S{i + 1}") == source:
+                return i
+        if source and source.upper().startswith("S") and source[1:].isdigit():
+            return int(source[1:]) - 1
+        return None
+
+    async def async_apply_scene(
+        self,
+        zones: list[int],
+        power: bool | None = None,
+        source: str | None = None,
+        volume_level: float | None = None,
+    ) -> int:
+        """
+        Set power / source / volume (0..1 of each zone's max) on many zones in
+        one POST. Zones the amp mirrors through a linked group are not sent
+        their own command. Returns once the amp has replied (the reply frames
+        confirm the optimistic values); the result is the number of lines sent.
+        """
+        wanted = set(zones)
+        zones = [z for z in self.zones if z in wanted]
+        groups = self.state.groups
+        lines: list[str] = []
+        optimistic: list[tuple[str, int, object]] = []
+        if power is not None:
+            for z in groups.cover(zones, LINK_POWER):
+                lines.append(f"01{encode_zone(z)}{'01' if power else '00'}")
+                optimistic.append(("power", z, "on" if power else "off"))
+        if source is not None:
+            for z in groups.cover(zones, LINK_SOURCE):
+                idx = self.source_index(z, source)
+                if idx is None:
+                    _LOGGER.warning("Unknown source '%s' for zone %s", source, z)
+                    continue
+                lines.append(f"03{encode_zone(z)}{ENCODE_SOURCE_MAP.get(idx, idx):02X}")
+                optimistic.append(("source", z, idx))
+        if volume_level is not None:
+            level = max(0.0, min(1.0, volume_level))
+            for z in zones:
+                self.ramps.cancel(z)
+            for z in groups.cover(zones, LINK_VOLUME):
+                raw = int(round(level * (self.state.zone(z).max_vol or 160)))
+                lines.append(f"04{encode_zone(z)}{raw:02X}")
+                optimistic.append(("volume", z, raw))
+        if not lines:
+            return 0
+
+        for field, z, value in optimistic:
+            self._set_optimistic(field, z, value)
+        try:
+            await self.commands.submit_many(lines)
+        except Exception:
+            for field, z, _ in optimistic:
+                self._rollback(field, z)
+            raise
+        return len(lines)
+
+    def request_preset_names(self) -> None:
+        """Start the preset-name fetch if it is wanted, still missing and the amp is reachable."""
+        if (
+            self.preset_names_wanted
+            and not self.preset_names_loaded
+            and (self.metrics.connected_since is not None or self.polling)
+            and (self._preset_task is None or self._preset_task.done())
+        ):
+            self._preset_task = self.hass.loop.create_task(self.async_load_preset_names())
+
+    async def async_load_preset_names(self) -> None:
+        """Fetch every preset name in one POST; not part of startup (see request_preset_names)."""
         try:
-            text = await self.api.initial_probe()
-            for line in text.split("\n"):
-                line = line.strip()
-                if line:
-                    _LOGGER.debug("SNAPSHOT RX (probe): %s", line)
-                    self._handle_frame(line)
+            self._handle_text(await self.api.request_preset_names(), "PRESET")
         except Exception as e:
-            _LOGGER.debug("Initial probe failed: %s", e)
+            _LOGGER.debug("Preset-name request failed; retrying after the next reconnect: %s", e)
+            return
+        self.preset_names_loaded = True
+        self._schedule_metadata_save()
+
+    async def async_recall_preset(self, preset: int) -> None:
+        """Recall a preset (key of preset_names); zones follow via the long-poll and a resync."""
+        # preset_names keys are the web app's preset number - 1
+        await self.commands.submit(f"{CMD_PRESET_RECALL}FF{preset + 2:02X}")
+        # A preset can change any zone; re-read them all in one POST
+        self._stale_zones.update(self.zones)
+        self._request_resync()
+
+    def ramp_volume(self, zones: list[int], volume_level: float, duration: float) -> None:
+        """Fade zones to volume_level (0..1 of each zone's max) over duration seconds."""
+        level = max(0.0, min(1.0, volume_level))
+        self._note_activity()
+        wanted = set(zones)
+        self.ramps.start(
+            {z: int(round(level * (self.state.zone(z).max_vol or 160))) for z in self.zones if z in wanted},
+            duration,
+        )
+
+    def _set_optimistic(self, field: str, zone: int, value) -> None:
+        pend = self.state.set_optimistic(field, zone, value)
+        if pend.handle is not None:
+            pend.handle.cancel()
+        pend.handle = self.hass.loop.call_later(OPTIMISTIC_TIMEOUT, self._rollback, field, zone)
+        if self.state.dirty:
+            self._schedule_publish()
+
+    def _rollback(self, field: str, zone: int) -> None:
+        pend = self.state.rollback(field, zone)
+        if pend is None:
+            return
+        pend.handle.cancel()
+        _LOGGER.debug("No confirmation for %s=%s on zone %s; rolling back to %s", field, pend.value, zone, pend.prev)
+        if self.state.dirty:
+            self._schedule_publish()
+
+    # -- trace recording ---------------------------------------------------------
+
+    def start_recording(self) -> None:
+        if self.recorder is None:
+            self.recorder = FrameRecorder()
+
+    async def async_export_recent_frames(self) -> str:
+        """Write the recent-frame buffer as a replay trace to the config dir; returns its path."""
+        entries = self.ring.to_trace()
+        host = self.host.replace(":", "_")
+        path = self.hass.config.path(f"axium_recent_{host}_{int(time.time())}.jsonl")
+        await self.hass.async_add_executor_job(write_trace, path, entries)
+        _LOGGER.info("Wrote %s recent Axium frames to %s", len(entries), path)
+        return path
+
+    async def async_stop_recording(self) -> str | None:
+        """Stop capturing and write the trace to the config dir; returns its path."""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        host = self.host.replace(":", "_")
+        path = self.hass.config.path(f"axium_trace_{host}_{int(time.time())}.jsonl")
+        await self.hass.async_add_executor_job(write_trace, path, recorder.entries)
+        _LOGGER.info("Wrote %s Axium trace entries to %s", len(recorder.entries), path)
+        return path
+
+    # -- persistent metadata -----------------------------------------------------
 
-        # 2) Mimic the web UI init (triggers 1C zone-name and 2A preset-name sweeps)
+    async def _async_load_metadata(self) -> bool:
+        """Seed names and group links from storage; returns True if a cache existed."""
         try:
-            text = await self.api.webapp_init()
-            for line in text.split("\n"):
-                line = line.strip()
-                if line:
-                    _LOGGER.debug("WEBINIT RX: %s", line)
-                    self._handle_frame(line)
+            data = await self.hub.async_load_metadata(self.host)
         except Exception as e:
-            _LOGGER.debug("Web-app init burst failed: %s", e)
+            _LOGGER.debug("Metadata cache load failed: %s", e)
+            return False
+        if not data:
+            return False
+        self.state.load_metadata(data)
+        self.metadata_refreshed_at = data.get("refreshed_at")
+        self.capabilities = Capabilities.from_dict(data.get("capabilities")) or Capabilities()
+        self.preset_names_loaded = data.get("preset_names_loaded", bool(self.state.preset_names))
+        return True
+
+    def _metadata_to_store(self) -> dict:
+        return {
+            "refreshed_at": self.metadata_refreshed_at,
+            "capabilities": self.capabilities.as_dict(),
+            "preset_names_loaded": self.preset_names_loaded,
+            **self.state.export_metadata(),
+        }
 
-        # 3) Per-zone snapshots (also requests names via 1BFF inside snapshot_burst)
-        for z in self.zones:
-            try:
-                text = await self.api.snapshot_burst(encode_zone(z))
-                for line in text.split("\n"):
-                    line = line.strip()
-                    if line:
-                        _LOGGER.debug("SNAPSHOT RX: %s", line)
-                        self._handle_frame(line)
-            except Exception as e:
-                _LOGGER.debug("Snapshot burst failed for zone %s: %s", z, e)
+    def _schedule_metadata_save(self):
+        self.hub.schedule_metadata_save(self.host, self._metadata_to_store)
+
+    @property
+    def metadata_stale(self) -> bool:
+        return self.metadata_refreshed_at is None or time.time() - self.metadata_refreshed_at > METADATA_TTL
+
+    async def async_refresh_metadata(self) -> None:
+        """
+        Re-fetch zone, source and preset names (and group links) from the amp,
+        and re-learn the capability profile from scratch: a firmware update
+        can add opcodes the cached profile has marked unsupported.
+        """
+        zone_hexes = [encode_zone(z) for z in self.zones]
+        try:
+            self._handle_text(await self.api.webapp_init(), "WEBINIT")
+            names = await self.api.request_metadata(zone_hexes)
+            self._handle_text(names, "NAME")
+        except Exception as e:
+            _LOGGER.debug("Metadata refresh failed: %s", e)
+            return
+        self.metadata_refreshed_at = time.time()
+        self.preset_names_loaded = True  # webapp_init() includes the preset sweep
+        # request_metadata() already sent 29 for every zone; probe the rest
+        try:
+            probe = await self.api.send_lines(
+                [f"{op}{zh}" for zh in zone_hexes for op in sorted(OPTIONAL_QUERY_OPCODES - {"29"})]
+            )
+        except Exception as e:
+            _LOGGER.debug("Capability re-probe failed; keeping the cached profile: %s", e)
+        else:
+            self._handle_text(probe, "PROBE")
+            profile = Capabilities().merge_replies(OPTIONAL_QUERY_OPCODES, (names, probe))
+            changed = profile.supported != self.capabilities.supported
+            self.capabilities = profile
+            if changed:
+                _LOGGER.debug("Capabilities for %s changed: answers %s", self.host, sorted(profile.supported))
+                # Supported features (mute) apply to every entity, not just the dirty fields
+                self.dirty_fields = None
+                self.async_update_listeners()
+        self._schedule_metadata_save()
+
+    async def _revalidate_metadata_later(self, delay_sec: float = 10.0):
+        await asyncio.sleep(delay_sec)
+        _LOGGER.debug("Cached metadata is older than %ss; revalidating", METADATA_TTL)
+        await self.async_refresh_metadata()
+
+    def _handle_text(self, text: str, tag: str):
+        if self.recorder is not None:
+            self.recorder.record(ENDPOINT_CGI, text)
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        frames, rejected = frame_text(text)
+        self.metrics.parse_failures += rejected
+        self._count_frames(frames)
+        for frame in frames:
+            if debug:
+                _LOGGER.debug("%s RX: %s", tag, frame)
+            self._handle_frame(frame, ENDPOINT_CGI)
+
+    async def async_config_entry_first_refresh(self):
+        """
+        Only local work before setup continues: the metadata cache and the
+        initial (empty or cache-named) snapshot. Entities are created from that
+        and stay unavailable until the long-poll connects; live state is
+        hydrated by a background task, so a slow or offline amp never holds up
+        HA startup.
+        """
+        t_start = time.monotonic()
+
+        # 0) Names/groups from the persistent cache; with a warm cache the name
+        #    sweeps below move off the critical path
+        cached = await self._async_load_metadata()
+        self.startup_timings["cache"] = round(time.monotonic() - t_start, 3)
 
         # Coordinator initial refresh (returns current cache)
         await super().async_config_entry_first_refresh()
 
-        # 4) Start long-poll stream
+        # Long-poll right away; it carries changes while the snapshot runs
         if self._lp_task is None:
             self._lp_task = self.hass.loop.create_task(self._longpoll_loop())
+        if self._hydrate_task is None:
+            self._hydrate_cached = cached
+            self._hydrate_task = self.hass.loop.create_task(self._async_hydrate(cached))
+
+    def _request_hydrate(self) -> None:
+        """
+        Re-run the startup snapshot once the amp is reachable if the last one
+        failed (e.g. the amp was off when HA started): the resync only covers
+        power/source/volume, not max volume, groups, source names or the
+        capability profile.
+        """
+        if self.hydrated or self._hydrate_task is None:
+            return
+        if self.metrics.connected_since is None and not self.polling:
+            return
+        if not self._hydrate_task.done():
+            self._hydrate_again = True
+            return
+        _LOGGER.debug("Amp %s is reachable again; re-running the startup snapshot", self.host)
+        self._hydrate_task = self.hass.loop.create_task(self._async_hydrate(self._hydrate_cached))
+
+    async def _async_hydrate(self, cached: bool):
+        self._hydrate_again = False
+        t_start = t_phase = time.monotonic()
+
+        def _mark(phase: str):
+            nonlocal t_phase
+            now = time.monotonic()
+            self.startup_timings[phase] = round(now - t_phase, 3)
+            t_phase = now
+
+        # 1-3) Snapshot queries; each POST is staggered with the other amps' startups
+        await self._async_startup_queries(cached, _mark)
+        self.startup_timings["total"] = round(time.monotonic() - t_start, 3)
+        _LOGGER.debug("Startup timings (s): %s", self.startup_timings)
+        self._publish_now()
+        if not self.hydrated:
+            # Name retries and revalidation would fail too. Runs again on the next
+            # connect, or right after this task ends if one happened meanwhile
+            if self._hydrate_again:
+                self.hass.loop.call_soon(self._request_hydrate)
+            return
+
+        # 4) Retry names for any zones still missing one (after short delay)
+        await self._retry_missing_names_later(delay_sec=3)
+
+        # 5) Revalidate an expired cache
+        if cached and self.metadata_stale:
+            await self._revalidate_metadata_later()
+
+    async def _async_startup_queries(self, cached: bool, _mark: Callable[[str], None]):
+        complete = True
 
-        # 5) Retry names for any zones still missing one (after short delay)
-        self.hass.loop.create_task(self._retry_missing_names_later(delay_sec=3))
+        # 1) Initial probe (many firmwares dump a snapshot)
+        try:
+            async with self.hub.startup_slot(self.host):
+                text = await self.api.initial_probe()
+            self._handle_text(text, "SNAPSHOT (probe)")
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+            # Amp not answering: don't queue two more connect timeouts behind the
+            # other amps' startups; retried once it is reachable (_request_hydrate)
+            _LOGGER.debug("Initial probe failed; amp unreachable: %s", e)
+            _mark("probe")
+            self.hydrated = False
+            return
+        except Exception as e:
+            _LOGGER.debug("Initial probe failed: %s", e)
+        _mark("probe")
+
+        # 2) Cold cache only: mimic the web UI init (triggers the 1C zone-name
+        #    sweep); preset names are loaded on first use (see request_preset_names)
+        if not cached:
+            try:
+                async with self.hub.startup_slot(self.host):
+                    text = await self.api.webapp_init(include_presets=False)
+                self._handle_text(text, "WEBINIT")
+                self.metadata_refreshed_at = time.time()
+                self._schedule_metadata_save()
+            except Exception as e:
+                complete = False
+                _LOGGER.debug("Web-app init burst failed: %s", e)
+        _mark("webapp_init")
+
+        # 3) All-zone snapshot in one (or a few concurrent) POSTs; 1BFF sent once,
+        #    and only when names are not already cached. Optional queries the
+        #    firmware never answered are left out; any not yet probed are sent
+        #    and the replies recorded in the capability profile
+        skip = self.capabilities.unsupported
+        try:
+            texts = await self.api.startup_snapshot(
+                [encode_zone(z) for z in self.zones],
+                include_names=not cached,
+                zones_per_post=SNAPSHOT_ZONES_PER_POST,
+                max_concurrency=SNAPSHOT_MAX_CONCURRENCY,
+                skip=skip,
+                gate=functools.partial(self.hub.startup_slot, self.host),
+            )
+            for text in texts:
+                self._handle_text(text, "SNAPSHOT")
+            if not self.capabilities.complete:
+                sent = OPTIONAL_QUERY_OPCODES - skip
+                if cached:
+                    sent -= {"29"}  # not queried; source names come from the cache
+                self._learn_capabilities(sent, texts)
+        except Exception as e:
+            complete = False
+            _LOGGER.debug("Startup snapshot failed: %s", e)
+            self._stale_zones.update(self.zones)  # resynced once the stream is up
+            self._request_resync()
+        _mark("snapshot")
+        self.hydrated = complete
+
+    def _learn_capabilities(self, sent: set[str], texts: list[str]) -> None:
+        chunks = math.ceil(len(self.zones) / SNAPSHOT_ZONES_PER_POST) if SNAPSHOT_ZONES_PER_POST > 0 else 1
+        profile = self.capabilities.merge_replies(sent, texts, complete=len(texts) >= chunks)
+        if profile.probed != self.capabilities.probed or profile.supported != self.capabilities.supported:
+            _LOGGER.debug(
+                "Capabilities for %s: answers %s, not %s", self.host, sorted(profile.supported), sorted(profile.unsupported)
+            )
+            self.capabilities = profile
+            self._schedule_metadata_save()
 
     async def _retry_missing_names_later(self, delay_sec: float = 3.0):
         await asyncio.sleep(delay_sec)
-        missing = [z for z in self.zones if not self.zone_names.get(z)]
+        missing = [z for z in self.zones if not self.state.zone(z).name]
         if not missing:
             return
         _LOGGER.debug("Retrying zone-name request for zones missing names: %s", missing)
         try:
             text = await self.api.send_lines([f"1B{encode_zone(z)}" for z in missing])
-            for line in text.split("\n"):
-                line = line.strip()
-                if line:
-                    _LOGGER.debug("NAME RX (retry): %s", line)
-                    self._handle_frame(line)
+            self._handle_text(text, "NAME (retry)")
         except Exception as e:
             _LOGGER.debug("Zone-name retry failed: %s", e)
 
     async def _longpoll_loop(self):
         backoff = 1
+        first = True
         while True:
             try:
-                if self.api._session.closed:
-                    self.api._session = async_get_clientsession(self.hass)
+                if not first:
+                    self.metrics.reconnects += 1
+                first = False
                 resp = await self.api.open_longpoll()
                 backoff = 1  # reset backoff on success
+                self.metrics.connected_since = time.time()
+                self._set_connected(True)
+                self._request_hydrate()
+                self._request_resync()
+                self.request_preset_names()
+                framer = LineFramer()  # partial lines never carry over a reconnect
                 try:
                     async for chunk, _ in resp.content.iter_chunks():
                         if not chunk:
                             continue
-                        text = chunk.decode(errors="ignore")
-                        for line in text.replace("\r", "").split("\n"):
-                            line = line.strip()
-                            if line:
-                                _LOGGER.debug("RX: %s", line)
-                                self._handle_frame(line)
+                        if self.recorder is not None:
+                            self.recorder.record(ENDPOINT_LONGPOLL, chunk)
+                        frames = framer.feed(chunk)
+                        if framer.rejected:
+                            # Counted as they happen, not when the stream drops
+                            self.metrics.parse_failures += framer.rejected
+                            framer.rejected = 0
+                        if _LOGGER.isEnabledFor(logging.DEBUG):
+                            for frame in frames:
+                                _LOGGER.debug("RX: %s", frame)
+                        await self._queue_frames(frames)
                 finally:
+                    self.metrics.connected_since = None
+                    self._stale_zones.update(self.zones)
                     await resp.release()
+            except asyncio.TimeoutError:
+                self.metrics.stalls += 1
+                _LOGGER.debug("Long-poll idle for %ss; reconnecting", self.longpoll_idle_timeout)
             except Exception as e:
-                _LOGGER.debug("Long-poll error, retrying in %ss: %s", backoff, e)
-                await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 30)  # cap backoff at 30s
-
-    def _handle_frame(self, line: str):
-        # Normalize and sanity-check
-        line = line.strip().upper()
-        if len(line) < 4:
-            return
-        if any(c not in "0123456789ABCDEF" for c in line):
-            _LOGGER.debug("Ignoring non-hex frame: %r", line)
-            return
-
-        cmd = line[:2]
-        zone_raw = line[2:4] if len(line) >= 4 else None
-        z = decode_zone(zone_raw) if zone_raw else None
-        data = line[4:]
-
-        changed = False  # only push if something actually changed
-
+                _LOGGER.debug("Long-poll error: %s", e)
+            self._set_connected(False)
+            # Jittered so several amps (or HA restarts) don't reconnect in lockstep;
+            # backoff was reset to 1 if this attempt got connected
+            delay = random.uniform(backoff / 2, backoff)
+            _LOGGER.debug("Reconnecting long-poll in %.1fs", delay)
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, LONGPOLL_BACKOFF_MAX)
+
+    async def _queue_frames(self, frames: list[str]) -> None:
+        """
+        Hand frames from the stream to the applier. While FRAME_QUEUE_MAX are
+        waiting the reader stops here, so TCP pushes back on the amp instead
+        of the queue growing (it can exceed the cap by one chunk).
+        """
+        q = self._frame_queue
+        q.extend(frames)
+        if len(q) > self.metrics.queue_peak:
+            self.metrics.queue_peak = len(q)
+        if q and self._apply_handle is None:
+            self._apply_handle = self.hass.loop.call_soon(self._apply_queued)
+        if len(q) >= FRAME_QUEUE_MAX:
+            self._frame_queue_space.clear()
+            await self._frame_queue_space.wait()
+
+    def _apply_queued(self):
+        """
+        Apply up to FRAME_BATCH_MAX queued frames, then yield the event loop
+        if more are waiting. Frames a later one in the batch supersedes (a
+        knob turn's intermediate volumes) are dropped unapplied; those that
+        could confirm a pending optimistic write are kept.
+        """
+        self._apply_handle = None
+        q = self._frame_queue
+        batch = [q.popleft() for _ in range(min(len(q), FRAME_BATCH_MAX))]
+        # Counted before collapsing: superseded frames were still received
+        self._count_frames(batch)
+        keep = {f"{_FIELD_OPCODES[f]}{encode_zone(z)}" for f, z in self.state.pending} if self.state.pending else ()
+        if len(q) < FRAME_QUEUE_MAX:
+            self._frame_queue_space.set()
+        frames = collapse_frames(batch, keep)
+        if len(frames) == len(batch):
+            for frame in frames:
+                self._handle_frame(frame, ENDPOINT_LONGPOLL)
+        else:
+            self.metrics.frames_superseded += len(batch) - len(frames)
+            # Survivors keep their order; superseded frames still go in the
+            # ring so exported traces match what the amp sent
+            i = 0
+            for line in batch:
+                if i < len(frames) and line == frames[i]:
+                    self._handle_frame(line, ENDPOINT_LONGPOLL)
+                    i += 1
+                else:
+                    self.ring.rx(ENDPOINT_LONGPOLL, line, SUPERSEDED)
+        if q:
+            self._apply_handle = self.hass.loop.call_soon(self._apply_queued)
+
+    def _request_resync(self):
+        if (
+            self._stale_zones
+            and self.metrics.connected_since is not None
+            and (self._resync_task is None or self._resync_task.done())
+        ):
+            self._resync_task = self.hass.loop.create_task(self._async_resync())
+
+    async def _async_resync(self):
+        """
+        Re-query live state for zones that may have changed during an outage:
+        one send_lines() POST for all of them, applied and published as one update.
+        """
+        mute = self.capabilities.supports(CMD_MUTE)
+        while self._stale_zones and self.metrics.connected_since is not None:
+            zones = sorted(self._stale_zones)
+            self._stale_zones.clear()
+            lines = [
+                ln
+                for z in zones
+                for ln in AxiumApi.resync_lines(
+                    encode_zone(z),
+                    include_name=not self.state.zone(z).name,
+                    include_mute=mute,
+                )
+            ]
+            try:
+                text = await self.api.send_lines(lines)
+            except Exception as e:
+                # Left stale; retried on the next reconnect
+                self._stale_zones.update(zones)
+                _LOGGER.debug("Resync of %s zones failed: %s", len(zones), e)
+                return
+            self.metrics.resyncs += 1
+            self.metrics.resync_zones += len(zones)
+            self._handle_text(text, "RESYNC")
+            self._publish_now()
+
+    def _count_frames(self, lines: list[str]):
+        self.frames_received += len(lines)
+        by_op = self.metrics.frames_by_opcode
+        for line in lines:
+            op = line[:2]
+            by_op[op] = by_op.get(op, 0) + 1
+
+    def _handle_frame(self, line: str, endpoint: str = ENDPOINT_LONGPOLL):
+        # Expects a framed line: stripped, upper-case hex, >= 4 chars (see LineFramer).
+        # Callers count it first (_count_frames), including frames they then drop
+        t0 = time.perf_counter()
+        m = self.metrics
+        frame = None
         try:
-            # 0x01: Power state/events
-            if cmd == "01" and len(data) >= 2:
-                if z is None:
-                    return
-                d = data[:2]
-                prev = self.power.get(z)
-                if d in ("01", "07"):
-                    self.power[z] = "on"
-                elif d in ("00", "06"):
-                    self.power[z] = "off"
-                if self.power.get(z) != prev:
-                    changed = True
-                g = self.zone_group.get(z)
-                if g is not None and (self.group_options.get(g, 0) & 0x04):
-                    for peer in self._linked_peers(z):
-                        if self.power.get(peer) != self.power.get(z):
-                            self.power[peer] = self.power.get(z)
-                            changed = True
-
-            # 0x03: Source select (with power bit)
-            elif cmd == "03" and len(data) >= 2:
-                if z is None:
-                    return
-                val = int(data[:2], 16)
-                if val & 0x80:
-                    if self.power.get(z) != "on":
-                        self.power[z] = "on"
-                        changed = True
-                    val &= 0x1F
-                decoded = DECODE_SOURCE_MAP.get(val, val)
-                if self.source.get(z) != decoded:
-                    self.source[z] = decoded
-                    changed = True
-                g = self.zone_group.get(z)
-                if g is not None and (self.group_options.get(g, 0) & 0x01):
-                    for peer in self._linked_peers(z):
-                        if self.source.get(peer) != decoded:
-                            self.source[peer] = decoded
-                            changed = True
-
-            # 0x04: Volume
-            elif cmd == "04" and len(data) >= 2:
-                if z is None:
-                    return
-                vol = int(data[:2], 16)
-                if self.volume.get(z) != vol:
-                    self.volume[z] = vol
-                    changed = True
-                g = self.zone_group.get(z)
-                if g is not None and (self.group_options.get(g, 0) & 0x02):
-                    for peer in self._linked_peers(z):
-                        if self.volume.get(peer) != vol:
-                            self.volume[peer] = vol
-                            changed = True
-
-            # 0x0D: Max volume
-            elif cmd == "0D" and len(data) >= 2:
-                if z is None:
-                    return
-                mv = int(data[:2], 16)
-                if self.max_vol.get(z) != mv:
-                    self.max_vol[z] = mv
-                    changed = True
-
-            # 0x14: Seen in captures — ignore
-            elif cmd == "14":
-                pass
-
-            # 0x1C: Zone name (reply to 1Bxx)
-            elif cmd == "1C":
-                # 1C <zone> <hex string, null-terminated>
-                try:
-                    data2 = data[:-1] if len(data) % 2 else data
-                    raw = bytes.fromhex(data2)
-                except Exception:
-                    raw = b""
-                name_bytes = raw.split(b"\x00", 1)[0]
-                try:
-                    name = name_bytes.decode("utf-8").strip()
-                except Exception:
-                    name = name_bytes.decode("latin-1", errors="ignore").strip()
-                if z is not None and name:
-                    prev = self.zone_names.get(z)
-                    if prev != name:
-                        self.zone_names[z] = name
-                        _LOGGER.debug("ZONENAME parsed: zone=%s name=%s (prev=%s)", z, name, prev)
-                        changed = True
-
-            # 0x29: Source name
-            elif cmd == "29" and len(data) >= 2:
-                enc_src = int(data[:2], 16)
-                norm = DECODE_SOURCE_MAP.get(enc_src, enc_src)
-                raw_name_hex = data[8:] if len(data) >= 8 else ""
-                if len(raw_name_hex) % 2 == 1:
-                    raw_name_hex = raw_name_hex[:-1]
-                try:
-                    name = bytes.fromhex(raw_name_hex).decode(errors="ignore").strip("\x00 ").strip()
-                except Exception:
-                    name = None
-                if name:
-                    targets = (self.zones if (z == 0xFF or z is None) else [z])
-                    updated_any = False
-                    for _zz in targets:
-                        prev = self.source_names.setdefault(_zz, {}).get(norm)
-                        if prev != name:
-                            self.source_names[_zz][norm] = name
-                            updated_any = True
-                    if updated_any:
-                        _LOGGER.debug("SRCNAME parsed: zone=%s enc=%s norm=%s name=%s", z, enc_src, norm, name)
-                        changed = True
-
-            # 0x2A: Preset name (optional — produced after 2B requests)
-            elif cmd == "2A" and len(data) >= 2:
-                # preset number is first byte (minus 1 per web app), then UTF-8 name
-                try:
-                    preset = int(data[:2], 16) - 1
-                except Exception:
-                    preset = None
-                pname_hex = data[2:]
-                if len(pname_hex) % 2 == 1:
-                    pname_hex = pname_hex[:-1]
-                try:
-                    pname = bytes.fromhex(pname_hex).decode(errors="ignore").strip("\x00 ").strip()
-                except Exception:
-                    pname = None
-                if preset is not None and pname:
-                    _LOGGER.debug("PRESETNAME parsed: preset=%s name=%s", preset, pname)
-                    # Store if/when you add self.preset_names and set changed=True
-
-            # 0x2B: Index sweep — no state change here
-            elif cmd == "2B":
-                pass
-
-            # 0x30: Group options & membership
-            elif cmd == "30" and len(data) >= 2:
-                try:
-                    opts = int(data[:2], 16)
-                    preamble_bytes = 5 if (opts & 0x80) else 1
-                    rest = data[2 * preamble_bytes:]
-                    zones = []
-                    for i in range(0, len(rest), 2):
-                        zz = rest[i:i+2]
-                        if len(zz) < 2:
-                            break
-                        dz = decode_zone(zz)
-                        if dz is not None:
-                            zones.append(dz)
-                    for dz in zones:
-                        self.zone_group[dz] = None
-                    used = {g for g in self.zone_group.values() if g is not None}
-                    spare = next((g for g in range(48) if g not in used), None)
-                    if spare is not None and len(zones) > 1:
-                        self.group_options[spare] = opts
-                        for dz in zones:
-                            if self.zone_group.get(dz) != spare:
-                                self.zone_group[dz] = spare
-                                changed = True
-                except Exception:
-                    pass
-
-            # 0x38: Keepalive/refresh — ignore
-            elif cmd == "38":
-                pass
-
-            else:
-                # Unknown/unsupported frame; ignore quietly
-                pass
-
+            frame = parse_frame(line)
+            self.ring.rx(endpoint, line, frame)
+            if frame is not None:
+                self.state.apply(frame)
         except Exception as e:
+            if frame is None:  # parse error (apply errors keep the parsed entry)
+                self.ring.rx(endpoint, line, e)
+            m.parse_failures += 1
             _LOGGER.debug("Frame parse error for '%s': %s", line, e)
-
-        if changed:
-            self.async_set_updated_data({
-                "power": self.power,
-                "volume": self.volume,
-                "source": self.source,
-                "max_vol": self.max_vol,
-                "source_names": self.source_names,
-                "zone_names": self.zone_names,
-            })
+            return
+        finally:
+            m.handle_seconds += time.perf_counter() - t0
+
+        if self.state.metadata_changed:
+            self.state.metadata_changed = False
+            self._schedule_metadata_save()
+            # Name-only changes (presets) touch no zone but still need publishing
+            self._schedule_publish()
+        elif self.state.dirty and self._publish_handle is None:
+            self._schedule_publish()
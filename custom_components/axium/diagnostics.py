@@ -0,0 +1,30 @@
+from __future__ import annotations
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"host", "unique_prefix"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    coord = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    snap = coord.state.snapshot()
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "metrics": coord.diagnostics(),
+        "recent_frames": coord.ring.entries(),
+        "state": {
+            "version": snap.version,
+            # source_names is a read-only mappingproxy, which the JSON encoder rejects
+            "zones": {
+                z: {**rec._asdict(), "source_names": dict(rec.source_names)} for z, rec in snap.zones.items()
+            },
+            "source_names": dict(snap.source_names),
+            "preset_names": dict(snap.preset_names),
+            "groups": coord.state.groups.export(),
+        },
+    }
@@ -1,21 +1,104 @@
 from __future__ import annotations
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from .coordinator import AxiumCoordinator
+from .state import ZoneState
 from .const import DOMAIN
 
+def amp_device_info(coordinator: AxiumCoordinator) -> DeviceInfo:
+    """The per-amp device holding amp-wide entities (diagnostic sensors, presets)."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, f"axium_{coordinator.host}")},
+        name=f"Axium {coordinator.host}",
+        manufacturer="Axium",
+        model="AX-series",
+    )
+
+
 class AxiumEntity(CoordinatorEntity[AxiumCoordinator]):
     _attr_has_entity_name = True
+    # ZoneState fields this entity shows; a publish that changes none of them
+    # for this zone skips the state write
+    _zone_fields: frozenset[str] = frozenset()
 
     def __init__(self, coordinator: AxiumCoordinator, zone: int):
         super().__init__(coordinator)
         self.zone = zone
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # Lets hub-wide services (apply_scene) map entity ids to amp + zone
+        self.coordinator.hub.add_entity(self.entity_id, self.coordinator.host, self.zone)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self.coordinator.hub.remove_entity(self.entity_id)
+        await super().async_will_remove_from_hass()
+
+    @property
+    def available(self) -> bool:
+        # Unavailable while neither the long-poll nor the polling fallback keeps
+        # state current, rather than showing stale state
+        return super().available and self.coordinator.live
+
+    @property
+    def zone_state(self) -> ZoneState:
+        """This zone's record from the latest published snapshot."""
+        return self.coordinator.data.zone(self.zone)
+
     @property
     def device_info(self) -> DeviceInfo:
         return DeviceInfo(
-            identifiers={(DOMAIN, f"axium_z{self.zone}")},
-            name=self.coordinator.zone_names.get(self.zone) or f"Axium Z{self.zone}",
+            identifiers={(DOMAIN, f"{self.coordinator.unique_prefix}_z{self.zone}")},
+            name=self.zone_state.name or f"Axium Z{self.zone}",
             manufacturer="Axium",
             model="AX-series",
         )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Only write state when the batch being published changed a field shown here
+        dirty = self.coordinator.dirty_fields
+        if dirty is None or not self._zone_fields.isdisjoint(dirty.get(self.zone, ())):
+            self.async_write_ha_state()
+
+
+class AxiumPresetEntity(CoordinatorEntity[AxiumCoordinator]):
+    """
+    Base for the amp-wide entities that show the preset names. Adding one to
+    HA is what makes the coordinator fetch the names (they are not part of
+    startup), so a disabled entity costs nothing.
+    """
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:playlist-star"
+
+    def __init__(self, coordinator: AxiumCoordinator):
+        super().__init__(coordinator)
+        self._shown: tuple | None = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # Fetched once the amp is reachable, then cached
+        self.coordinator.preset_names_wanted = True
+        self.coordinator.request_preset_names()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return amp_device_info(self.coordinator)
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.coordinator.live
+
+    @property
+    def preset_names(self) -> list[str]:
+        return [name for _, name in sorted(self.coordinator.data.preset_names.items())]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Only the preset names and availability show up in this entity's state
+        shown = (self.available, tuple(self.preset_names))
+        if shown != self._shown:
+            self._shown = shown
+            self.async_write_ha_state()
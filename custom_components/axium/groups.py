@@ -0,0 +1,104 @@
+from __future__ import annotations
+import heapq
+from typing import Iterable
+
+# Group option bits (0x30 frames): which controls the amp mirrors across members
+LINK_SOURCE = 0x01
+LINK_VOLUME = 0x02
+LINK_POWER = 0x04
+
+_NO_PEERS: frozenset[int] = frozenset()
+
+
+class GroupIndex:
+    """
+    Zone-group membership index.
+
+    Keeps group -> members, zone -> group and group -> options, plus a
+    precomputed zone -> peers map so peer lookups on every power/source/volume
+    frame are a single dict access. A 0x30 frame only touches the groups its
+    zones belonged to; a group left with fewer than two members is dissolved
+    and its ID returned to the free pool.
+    """
+
+    def __init__(self, max_groups: int = 48):
+        self._free: list[int] = list(range(max_groups))  # heap of unused IDs
+        self.members: dict[int, frozenset[int]] = {}
+        self.options: dict[int, int] = {}
+        self.zone_group: dict[int, int] = {}
+        self._peers: dict[int, frozenset[int]] = {}
+
+    def group_of(self, zone: int) -> int | None:
+        return self.zone_group.get(zone)
+
+    def options_of(self, zone: int) -> int:
+        g = self.zone_group.get(zone)
+        return 0 if g is None else self.options[g]
+
+    def peers(self, zone: int) -> frozenset[int]:
+        return self._peers.get(zone, _NO_PEERS)
+
+    def cover(self, zones: Iterable[int], link: int) -> list[int]:
+        """
+        The zones of `zones` that need a command when groups with the `link`
+        bit (LINK_*) mirror it to their peers: one zone per linked group,
+        every unlinked zone. Input order is kept.
+        """
+        out: list[int] = []
+        covered: set[int] = set()
+        for z in zones:
+            if z in covered:
+                continue
+            out.append(z)
+            if self.options_of(z) & link:
+                covered.update(self._peers.get(z, _NO_PEERS))
+        return out
+
+    def assign(self, zones: Iterable[int], options: int) -> set[int]:
+        """
+        Apply a 0x30 membership frame: the listed zones leave their current
+        groups and, if there are at least two, form a new group with `options`.
+        Returns every zone whose membership changed (none when the frame
+        repeats an existing group, as every snapshot and resync does).
+        """
+        zones = frozenset(zones)
+        if len(zones) > 1:
+            g = self.zone_group.get(next(iter(zones)))
+            if g is not None and self.members[g] == zones and self.options[g] == options:
+                return set()
+        affected: set[int] = set()
+        for z in zones:
+            affected |= self._leave(z)
+        if len(zones) > 1 and self._free:
+            g = heapq.heappop(self._free)
+            self.members[g] = zones
+            self.options[g] = options
+            for z in zones:
+                self.zone_group[z] = g
+                self._peers[z] = zones - {z}
+            affected |= zones
+        return affected
+
+    def _leave(self, zone: int) -> set[int]:
+        g = self.zone_group.pop(zone, None)
+        if g is None:
+            return set()
+        del self._peers[zone]
+        rest = self.members[g] - {zone}
+        if len(rest) > 1:
+            self.members[g] = rest
+            for z in rest:
+                self._peers[z] = rest - {z}
+            return {zone}
+        # Fewer than two members left: dissolve and reclaim the ID
+        for z in rest:
+            del self.zone_group[z]
+            del self._peers[z]
+        del self.members[g]
+        del self.options[g]
+        heapq.heappush(self._free, g)
+        return {zone} | rest
+
+    def export(self) -> list[list]:
+        """[[options, [zones...]], ...] for persistence."""
+        return [[self.options[g], sorted(m)] for g, m in self.members.items()]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_HUB,
+    DOMAIN,
+    HUB_MAX_IN_FLIGHT,
+    HUB_STARTUP_CONCURRENCY,
+    HUB_STARTUP_STAGGER,
+    METADATA_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import AxiumCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> AxiumHub:
+    """The hub shared by every Axium config entry (created on first use)."""
+    hub = hass.data.get(DATA_HUB)
+    if hub is None:
+        hub = hass.data[DATA_HUB] = AxiumHub(hass)
+    return hub
+
+
+class AxiumHub:
+    """
+    Shared scheduler for all amps in one HA instance.
+
+    - startup_slot(): startup POSTs run at most HUB_STARTUP_CONCURRENCY at a
+      time, started at least HUB_STARTUP_STAGGER apart; taken per POST, so an
+      amp's later steps queue behind the other amps again
+    - request_limit: caps axium.cgi POSTs in flight across all amps (the
+      long-polls are not counted); an amp that is not answering bypasses it
+      (see AxiumApi.reachable) rather than hold a slot through its timeouts
+    - one metadata Store holding every amp's names and groups, keyed by host
+    - zone index: (host, zone) -> coordinator for every configured zone, plus
+      entity_id -> (host, zone) for the zone entities; the apply_scene and
+      ramp_volume services resolve their targets through it
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.request_limit = asyncio.Semaphore(HUB_MAX_IN_FLIGHT)
+        self._startup = asyncio.Semaphore(HUB_STARTUP_CONCURRENCY)
+        self._next_start = 0.0
+        self._last_start: str | None = None  # host that last took a startup slot
+        self.coordinators: dict[str, AxiumCoordinator] = {}  # by host
+        self._zone_index: dict[tuple[str, int], AxiumCoordinator] = {}
+        self._entity_zones: dict[str, tuple[str, int]] = {}  # entity_id -> (host, zone)
+
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.metadata")
+        self._metadata: dict[str, dict] | None = None
+        self._load_lock = asyncio.Lock()
+        self._savers: dict[str, Callable[[], dict]] = {}
+
+    # -- registry / zone index ---------------------------------------------------
+
+    def add(self, coordinator: AxiumCoordinator) -> None:
+        self.coordinators[coordinator.host] = coordinator
+        for z in coordinator.zones:
+            self._zone_index[(coordinator.host, z)] = coordinator
+
+    def remove(self, coordinator: AxiumCoordinator) -> None:
+        if self.coordinators.get(coordinator.host) is coordinator:
+            del self.coordinators[coordinator.host]
+        saver = self._savers.pop(coordinator.host, None)
+        if saver is not None and self._metadata is not None:
+            # Keep the amp's latest data (newer than the file until the delayed
+            # save runs) for a reload, without holding on to the coordinator
+            self._metadata[coordinator.host] = saver()
+        for z in coordinator.zones:
+            if self._zone_index.get((coordinator.host, z)) is coordinator:
+                del self._zone_index[(coordinator.host, z)]
+
+    def add_entity(self, entity_id: str, host: str, zone: int) -> None:
+        self._entity_zones[entity_id] = (host, zone)
+
+    def remove_entity(self, entity_id: str) -> None:
+        self._entity_zones.pop(entity_id, None)
+
+    def resolve_entities(self, entity_ids: Iterable[str]) -> dict[AxiumCoordinator, list[int]]:
+        """Group zone entities (any platform) by amp; unknown ids are ignored."""
+        out: dict[AxiumCoordinator, list[int]] = {}
+        for entity_id in entity_ids:
+            key = self._entity_zones.get(entity_id)
+            coordinator = None if key is None else self._zone_index.get(key)
+            if coordinator is not None and key[1] not in out.get(coordinator, ()):
+                out.setdefault(coordinator, []).append(key[1])
+        return out
+
+    # -- startup scheduling ------------------------------------------------------
+
+    @asynccontextmanager
+    async def startup_slot(self, host: str):
+        async with self._startup:
+            # The stagger spaces out different amps; one amp's consecutive steps aren't delayed
+            if host != self._last_start:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + HUB_STARTUP_STAGGER
+                self._last_start = host
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield
+
+    # -- shared metadata cache ---------------------------------------------------
+
+    async def async_load_metadata(self, host: str) -> dict | None:
+        async with self._load_lock:
+            if self._metadata is None:
+                self._metadata = await self._store.async_load() or {}
+        return self._metadata.get(host)
+
+    def forget_metadata(self, host: str) -> None:
+        """Drop a deleted amp's cache from the store."""
+        self._savers.pop(host, None)
+        if self._metadata is not None and self._metadata.pop(host, None) is not None:
+            self._store.async_delay_save(self._data_to_store, METADATA_SAVE_DELAY)
+
+    def schedule_metadata_save(self, host: str, data_fn: Callable[[], dict]) -> None:
+        self._savers[host] = data_fn
+        self._store.async_delay_save(self._data_to_store, METADATA_SAVE_DELAY)
+
+    def _data_to_store(self) -> dict:
+        data = dict(self._metadata or {})
+        for host, data_fn in self._savers.items():
+            data[host] = data_fn()
+        return data
@@ -9,6 +9,7 @@ from homeassistant.components.media_player import (
 )
 from .entity import AxiumEntity
 from .coordinator import AxiumCoordinator, encode_zone, ENCODE_SOURCE_MAP
+from .const import CMD_MUTE
 
 SUPPORT_FLAGS = (
     MediaPlayerEntityFeature.VOLUME_SET
@@ -24,16 +25,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     async_add_entities(entities)
 
 class AxiumZonePlayer(AxiumEntity, MediaPlayerEntity):
-    _attr_supported_features = SUPPORT_FLAGS
+    _zone_fields = frozenset({"power", "mute", "volume", "max_vol", "source", "source_names"})
 
     def __init__(self, coordinator: AxiumCoordinator, zone: int):
         super().__init__(coordinator, zone)
         self._attr_name = f"Zone {zone}"
-        self._attr_unique_id = f"axium_media_z{zone}"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_media_z{zone}"
+
+    @property
+    def supported_features(self) -> MediaPlayerEntityFeature:
+        # Mute only on firmwares whose capability profile shows they answer 02
+        if self.coordinator.capabilities.supports(CMD_MUTE):
+            return SUPPORT_FLAGS | MediaPlayerEntityFeature.VOLUME_MUTE
+        return SUPPORT_FLAGS
 
     @property
     def state(self):
-        p = self.coordinator.power.get(self.zone)
+        p = self.zone_state.power
         if p == "on":
             return MediaPlayerState.ON
         if p == "off":
@@ -41,50 +49,51 @@ class AxiumZonePlayer(AxiumEntity, MediaPlayerEntity):
         return None
 
     async def async_turn_on(self):
-        await self.coordinator.api.send(f"01{encode_zone(self.zone)}01")
+        await self.coordinator.async_send_command(f"01{encode_zone(self.zone)}01", self.zone, power="on")
 
     async def async_turn_off(self):
-        await self.coordinator.api.send(f"01{encode_zone(self.zone)}00")
+        await self.coordinator.async_send_command(f"01{encode_zone(self.zone)}00", self.zone, power="off")
 
     @property
     def volume_level(self) -> float | None:
-        v = self.coordinator.volume.get(self.zone)
-        mv = self.coordinator.max_vol.get(self.zone) or 160
+        zs = self.zone_state
+        v = zs.volume
+        mv = zs.max_vol or 160
         if v is None:
             return None
         return max(0.0, min(1.0, v / mv))
 
     async def async_set_volume_level(self, volume: float) -> None:
-        mv = self.coordinator.max_vol.get(self.zone) or 160
+        mv = self.zone_state.max_vol or 160
         raw = int(round(max(0.0, min(1.0, volume)) * mv))
-        await self.coordinator.api.send(f"04{encode_zone(self.zone)}{raw:02X}")
+        await self.coordinator.async_send_command(f"04{encode_zone(self.zone)}{raw:02X}", self.zone, volume=raw)
+
+    @property
+    def is_volume_muted(self) -> bool | None:
+        return self.zone_state.mute
+
+    async def async_mute_volume(self, mute: bool) -> None:
+        await self.coordinator.async_send_command(
+            f"{CMD_MUTE}{encode_zone(self.zone)}{'01' if mute else '00'}", self.zone, mute=mute
+        )
+
+    def _source_label(self, idx: int) -> str:
+        return self.coordinator.data.source_name(self.zone, idx) or f"S{idx+1}"
 
     @property
     def source_list(self) -> list[str] | None:
-        names = self.coordinator.source_names.get(self.zone, {})
-        return [names.get(i, f"S{i+1}") for i in range(8)]
+        return [self._source_label(i) for i in range(8)]
 
     @property
     def source(self) -> str | None:
-        cur = self.coordinator.source.get(self.zone)
+        cur = self.zone_state.source
         if cur is None:
             return None
-        names = self.coordinator.source_names.get(self.zone, {})
-        return names.get(cur, f"S{cur+1}")
+        return self._source_label(cur)
 
     async def async_select_source(self, source: str) -> None:
-        names = self.coordinator.source_names.get(self.zone, {})
-        for i in range(8):
-            if names.get(i, f"S{i+1}") == source:
-                idx = i
-                break
-        else:
-            if source and source.upper().startswith("S"):
-                try:
-                    idx = int(source[1:]) - 1
-                except Exception:
-                    return
-            else:
-                return
+        idx = self.coordinator.source_index(self.zone, source)
+        if idx is None:
+            return
         ax_val = ENCODE_SOURCE_MAP.get(idx, idx)
-        await self.coordinator.api.send(f"03{encode_zone(self.zone)}{ax_val:02X}")
+        await self.coordinator.async_send_command(f"03{encode_zone(self.zone)}{ax_val:02X}", self.zone, source=idx)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import bisect
+import time
+
+# Upper bucket bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+EWMA_ALPHA = 0.2  # weight of the newest sample in Histogram.recent
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() takes seconds, reports milliseconds."""
+
+    __slots__ = ("counts", "count", "total", "max", "recent")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: float | None = None  # EWMA (ms) tracking current conditions
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.recent = ms if self.recent is None else self.recent + EWMA_ALPHA * (ms - self.recent)
+
+    @property
+    def mean_ms(self) -> float | None:
+        return round(self.total / self.count, 2) if self.count else None
+
+    def percentile_ms(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile (max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else round(self.max, 2)
+        return round(self.max, 2)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.mean_ms,
+            "p50_ms": self.percentile_ms(0.5),
+            "p95_ms": self.percentile_ms(0.95),
+            "max_ms": round(self.max, 2),
+            "recent_ms": None if self.recent is None else round(self.recent, 2),
+            "buckets_ms": dict(zip([*map(str, LATENCY_BUCKETS_MS), "inf"], self.counts)),
+        }
+
+
+class ApiMetrics:
+    """HTTP-level counters kept by AxiumApi."""
+
+    def __init__(self):
+        self.latency: dict[str, Histogram] = {"cgi": Histogram(), "longpoll": Histogram()}
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "latency": {ep: h.as_dict() for ep, h in self.latency.items()},
+        }
+
+
+class StreamMetrics:
+    """Long-poll and parser counters kept by the coordinator."""
+
+    def __init__(self):
+        self.frames_by_opcode: dict[str, int] = {}
+        self.parse_failures = 0
+        self.handle_seconds = 0.0  # total time spent in _handle_frame
+        self.reconnects = 0
+        self.stalls = 0  # streams dropped by the idle watchdog
+        self.resyncs = 0  # post-reconnect resync POSTs
+        self.resync_zones = 0
+        self.frames_superseded = 0  # long-poll frames collapsed before being applied
+        self.queue_peak = 0  # most long-poll frames waiting for the applier at once
+        self.connected_since: float | None = None  # wall clock, None while down
+
+    @property
+    def uptime(self) -> float | None:
+        return None if self.connected_since is None else round(time.time() - self.connected_since, 1)
+
+    def as_dict(self) -> dict:
+        # Superseded frames are counted by opcode but never reach _handle_frame
+        frames = sum(self.frames_by_opcode.values()) - self.frames_superseded
+        return {
+            "frames_by_opcode": dict(sorted(self.frames_by_opcode.items())),
+            "parse_failures": self.parse_failures,
+            "handle_frame_total_ms": round(self.handle_seconds * 1000, 2),
+            "handle_frame_mean_us": round(self.handle_seconds * 1e6 / frames, 2) if frames else None,
+            "longpoll_reconnects": self.reconnects,
+            "longpoll_stalls": self.stalls,
+            "resyncs": self.resyncs,
+            "resync_zones": self.resync_zones,
+            "frames_superseded": self.frames_superseded,
+            "frame_queue_peak": self.queue_peak,
+            "longpoll_uptime_s": self.uptime,
+        }
@@ -18,24 +18,23 @@ class AxiumVolumeNumber(AxiumEntity, NumberEntity):
     _attr_native_max_value = 160
     _attr_native_step = 1
     _attr_icon = "mdi:volume-high"
+    _zone_fields = frozenset({"volume", "name"})
 
     def __init__(self, coordinator: AxiumCoordinator, zone: int):
         super().__init__(coordinator, zone)
         self._attr_name = f"Z{zone} Volume"
-        self._attr_unique_id = f"axium_z{zone}_volume"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_z{zone}_volume"
 
     @property
     def name(self):
-        base = self.coordinator.zone_names.get(self.zone) or f"Axium Z{self.zone}"
+        base = self.zone_state.name or f"Axium Z{self.zone}"
         return f"{base} Volume"
 
     @property
     def native_value(self) -> float | None:
-        return self.coordinator.volume.get(self.zone)
+        return self.zone_state.volume
 
     async def async_set_native_value(self, value: float) -> None:
         v = max(0, min(160, int(value)))
         hexv = f"{v:02X}"
-        await self.coordinator.api.send(f"04{encode_zone(self.zone)}{hexv}")
-        self.coordinator.volume[self.zone] = v
-        self.async_write_ha_state()
+        await self.coordinator.async_send_command(f"04{encode_zone(self.zone)}{hexv}", self.zone, volume=v)
@@ -0,0 +1,352 @@
+from __future__ import annotations
+from typing import Callable, Container, NamedTuple
+
+# Accepted frame characters; a frame is valid iff stripping these leaves nothing
+_HEX_DIGITS = b"0123456789ABCDEFabcdef"
+
+
+class LineFramer:
+    """
+    Incremental line framer for the axium.cgi / axiumlong.cgi byte streams.
+
+    Bytes are buffered until a newline arrives, so a frame split across TCP chunks
+    is reassembled instead of being dropped or misparsed. Complete lines are
+    validated as hex and upper-cased on the raw bytes, then decoded to str once.
+    """
+
+    __slots__ = ("_buf", "max_line", "rejected")
+
+    def __init__(self, max_line: int = 1024):
+        self._buf = b""
+        self.max_line = max_line
+        self.rejected = 0  # non-hex or oversized lines dropped
+
+    def feed(self, data: bytes) -> list[str]:
+        """Consume a chunk and return the complete frames it finished."""
+        if self._buf:
+            data = self._buf + data
+        lines = data.split(b"\n")
+        tail = lines.pop()
+        if len(tail) > self.max_line:
+            # No terminator in sight; drop rather than grow without bound
+            self.rejected += 1
+            tail = b""
+        self._buf = tail
+        return self._frames(lines)
+
+    def flush(self) -> list[str]:
+        """Return any trailing unterminated frame (end of a POST response)."""
+        tail, self._buf = self._buf, b""
+        return self._frames((tail,))
+
+    def _frames(self, lines) -> list[str]:
+        out = []
+        for ln in lines:
+            ln = ln.strip()  # drops \r; returns the same object when nothing to strip
+            if len(ln) < 4:
+                continue
+            if ln.strip(_HEX_DIGITS):
+                self.rejected += 1
+                continue
+            out.append(ln.upper().decode("ascii"))
+        return out
+
+
+def frame_text(text: str) -> tuple[list[str], int]:
+    """Frame a complete response body; also returns how many lines were rejected."""
+    framer = LineFramer(max_line=len(text) + 1)
+    frames = framer.feed(text.encode("latin-1", errors="ignore"))
+    frames.extend(framer.flush())
+    return frames, framer.rejected
+
+
+def split_frames(text: str) -> list[str]:
+    """Frame a complete response body (e.g. an axium.cgi POST reply)."""
+    return frame_text(text)[0]
+
+
+# Report opcodes where a later frame for the same zone carries everything an
+# earlier one did (power, mute, source, volume, max volume)
+SUPERSEDED_OPCODES = frozenset({"01", "02", "03", "04", "0D"})
+# Frames nothing may be collapsed across: group changes decide which peers
+# the frames around them are applied to
+BARRIER_OPCODES = frozenset({"30"})
+
+
+def _supersede_key(line: str) -> str:
+    if line[:2] == "03" and len(line) >= 6 and HEX_BYTE.get(line[4:6], 0) & 0x80:
+        # A source report that also powers the zone on is not replaced by one that doesn't
+        return line[:4] + "P"
+    return line[:4]
+
+
+def collapse_frames(lines: list[str], keep: Container[str] = ()) -> list[str]:
+    """
+    Drop frames a later frame in the same batch supersedes (same opcode and
+    zone, see SUPERSEDED_OPCODES), keeping the survivors in arrival order.
+    Nothing is collapsed across a BARRIER_OPCODES frame; frames whose
+    opcode+zone prefix is in keep (e.g. awaiting an optimistic confirmation)
+    are never dropped.
+    """
+    out: list[str] = []
+    seen: set[str] = set()
+    for line in reversed(lines):
+        op = line[:2]
+        if op in BARRIER_OPCODES:
+            seen.clear()
+        elif op in SUPERSEDED_OPCODES and line[:4] not in keep:
+            key = _supersede_key(line)
+            if key in seen:
+                continue
+            seen.add(key)
+        out.append(line)
+    out.reverse()
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Zone / source encoding tables
+# ---------------------------------------------------------------------------
+
+def _encode_zone(zone: int) -> str:
+    z = zone
+    if z != 0xFF:
+        if z >= 64:
+            z = 0xC0 + (z - 64)
+        elif z >= 32:
+            z = 0x80 + (z - 32)
+    return f"{z:02X}"
+
+
+def _decode_zone(z: int) -> int | None:
+    if z != 0xFF:
+        z &= ~0x20
+        top = z & 0xC0
+        if top == 0x80:
+            return 32 + (z & 0x1F)
+        if top == 0xC0:
+            return 64 + (z & 0x1F)
+        if top == 0x40:
+            return None
+    return z
+
+
+# "00".."FF" -> int; frames are upper-case after LineFramer, so one lookup per byte
+HEX_BYTE: dict[str, int] = {f"{i:02X}": i for i in range(256)}
+
+ZONE_ENCODE: tuple[str, ...] = tuple(_encode_zone(z) for z in range(256))
+ZONE_DECODE: tuple[int | None, ...] = tuple(_decode_zone(z) for z in range(256))
+# Wire hex -> zone number (or None for the reserved 0x40 block)
+ZONE_DECODE_HEX: dict[str, int | None] = {h: ZONE_DECODE[i] for h, i in HEX_BYTE.items()}
+
+DECODE_SOURCE_MAP = {0: 4, 1: 5, 2: 6, 3: 3, 4: 7, 5: 0, 6: 1, 7: 2}
+ENCODE_SOURCE_MAP = {v: k for k, v in DECODE_SOURCE_MAP.items()}
+SOURCE_DECODE: tuple[int, ...] = tuple(DECODE_SOURCE_MAP.get(v, v) for v in range(256))
+SOURCE_ENCODE: tuple[int, ...] = tuple(ENCODE_SOURCE_MAP.get(v, v) for v in range(256))
+
+
+def encode_zone(zone: int) -> str:
+    if 0 <= zone < 256:
+        return ZONE_ENCODE[zone]
+    return _encode_zone(zone)
+
+
+def decode_zone(z_hex: str) -> int | None:
+    try:
+        return ZONE_DECODE_HEX[z_hex]
+    except KeyError:
+        pass
+    try:
+        z = int(z_hex, 16)
+    except ValueError:
+        return None
+    return ZONE_DECODE[z] if 0 <= z < 256 else _decode_zone(z)
+
+
+# ---------------------------------------------------------------------------
+# Frame records
+# ---------------------------------------------------------------------------
+
+class PowerFrame(NamedTuple):
+    zone: int
+    power: str | None  # "on" / "off" / None for unrecognised event codes
+
+
+class MuteFrame(NamedTuple):
+    zone: int
+    muted: bool
+
+
+class SourceFrame(NamedTuple):
+    zone: int
+    source: int  # normalised 0-based input
+    power_on: bool  # 0x80 bit: selecting a source also powers the zone
+
+
+class VolumeFrame(NamedTuple):
+    zone: int
+    volume: int
+
+
+class MaxVolFrame(NamedTuple):
+    zone: int
+    max_vol: int
+
+
+class ZoneNameFrame(NamedTuple):
+    zone: int
+    name: str
+
+
+class SourceNameFrame(NamedTuple):
+    zone: int | None  # None / 0xFF -> applies to every zone
+    source: int
+    name: str
+
+
+class PresetNameFrame(NamedTuple):
+    preset: int
+    name: str
+
+
+class GroupFrame(NamedTuple):
+    options: int
+    zones: tuple[int, ...]
+
+
+class ModelFrame(NamedTuple):
+    zone: int | None
+    data: str  # raw model/flags hex; the layout varies by firmware
+
+
+# ---------------------------------------------------------------------------
+# Parser registry
+# ---------------------------------------------------------------------------
+
+FrameHandler = Callable[["int | None", str], "NamedTuple | None"]
+_HANDLERS: dict[str, FrameHandler] = {}
+
+
+def register_frame(opcode: str) -> Callable[[FrameHandler], FrameHandler]:
+    """Register a decoder for an opcode: handler(zone, data) -> record or None."""
+    def deco(fn: FrameHandler) -> FrameHandler:
+        _HANDLERS[opcode.upper()] = fn
+        return fn
+    return deco
+
+
+def parse_frame(line: str):
+    """
+    Decode a framed line into a typed record, or None if the opcode is not
+    registered / the frame carries nothing to apply. May raise on malformed data.
+    """
+    handler = _HANDLERS.get(line[:2])
+    if handler is None:
+        return None
+    return handler(ZONE_DECODE_HEX.get(line[2:4]), line[4:])
+
+
+def _hex_text(raw_hex: str) -> str:
+    if len(raw_hex) % 2:
+        raw_hex = raw_hex[:-1]
+    return bytes.fromhex(raw_hex).decode(errors="ignore").strip("\x00 ").strip()
+
+
+@register_frame("01")
+def _parse_power(z, data):
+    if z is None or len(data) < 2:
+        return None
+    d = data[:2]
+    if d in ("01", "07"):
+        return PowerFrame(z, "on")
+    if d in ("00", "06"):
+        return PowerFrame(z, "off")
+    return PowerFrame(z, None)
+
+
+@register_frame("02")
+def _parse_mute(z, data):
+    if z is None or len(data) < 2:
+        return None
+    return MuteFrame(z, bool(HEX_BYTE[data[:2]] & 0x01))
+
+
+@register_frame("03")
+def _parse_source(z, data):
+    if z is None or len(data) < 2:
+        return None
+    val = HEX_BYTE[data[:2]]
+    if val & 0x80:
+        return SourceFrame(z, SOURCE_DECODE[val & 0x1F], True)
+    return SourceFrame(z, SOURCE_DECODE[val], False)
+
+
+@register_frame("04")
+def _parse_volume(z, data):
+    if z is None or len(data) < 2:
+        return None
+    return VolumeFrame(z, HEX_BYTE[data[:2]])
+
+
+@register_frame("0D")
+def _parse_max_vol(z, data):
+    if z is None or len(data) < 2:
+        return None
+    return MaxVolFrame(z, HEX_BYTE[data[:2]])
+
+
+@register_frame("1C")
+def _parse_zone_name(z, data):
+    # 1C <zone> <hex string, null-terminated>
+    if z is None:
+        return None
+    try:
+        raw = bytes.fromhex(data[:-1] if len(data) % 2 else data)
+    except ValueError:
+        raw = b""
+    name_bytes = raw.split(b"\x00", 1)[0]
+    try:
+        name = name_bytes.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        name = name_bytes.decode("latin-1", errors="ignore").strip()
+    return ZoneNameFrame(z, name) if name else None
+
+
+@register_frame("29")
+def _parse_source_name(z, data):
+    if len(data) < 2:
+        return None
+    norm = SOURCE_DECODE[HEX_BYTE[data[:2]]]
+    name = _hex_text(data[8:]) if len(data) >= 8 else ""
+    if not name:
+        return None
+    return SourceNameFrame(None if z == 0xFF else z, norm, name)
+
+
+@register_frame("2A")
+def _parse_preset_name(z, data):
+    # preset number is first byte (minus 1 per web app), then UTF-8 name
+    if len(data) < 2:
+        return None
+    name = _hex_text(data[2:])
+    return PresetNameFrame(HEX_BYTE[data[:2]] - 1, name) if name else None
+
+
+@register_frame("3C")
+def _parse_model(z, data):
+    return ModelFrame(None if z == 0xFF else z, data) if data else None
+
+
+@register_frame("30")
+def _parse_group(z, data):
+    # 30 <zone> <opts> [4 more preamble bytes if opts & 0x80] <member zones...>
+    if len(data) < 2:
+        return None
+    opts = HEX_BYTE[data[:2]]
+    rest = data[10:] if (opts & 0x80) else data[2:]
+    zones = []
+    for i in range(0, len(rest) - 1, 2):
+        dz = ZONE_DECODE_HEX[rest[i:i + 2]]
+        if dz is not None:
+            zones.append(dz)
+    return GroupFrame(opts, tuple(zones))
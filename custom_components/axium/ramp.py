@@ -0,0 +1,113 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable
+
+from .commands import CommandQueue
+from .const import RAMP_LATENCY_FACTOR, RAMP_MAX_INTERVAL, RAMP_MIN_INTERVAL
+from .groups import LINK_VOLUME
+from .protocol import encode_zone
+from .state import AxiumState
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Ramp:
+    __slots__ = ("start", "target", "t0", "duration", "expected")
+
+    def __init__(self, start: int, target: int, duration: float, current: int | None):
+        self.start = start
+        self.target = target
+        self.t0 = time.monotonic()
+        self.duration = duration
+        # Volumes the zone may still report without it being an outside change:
+        # the one it had when the ramp started, then every step the amp has not
+        # echoed yet (echoes can lag several ticks behind)
+        self.expected: deque[int | None] = deque((current,))
+
+    def value_at(self, now: float) -> int:
+        if self.duration <= 0 or now - self.t0 >= self.duration:
+            return self.target
+        return round(self.start + (self.target - self.start) * (now - self.t0) / self.duration)
+
+
+class RampEngine:
+    """
+    Linear volume fades for any number of zones, driven by one task.
+
+    Each tick sends the next step of every active ramp as one submit_many()
+    batch and waits for the reply before the next tick, so at most one ramp
+    POST is ever in flight. The tick interval is RAMP_LATENCY_FACTOR x the
+    recent command latency (latency_ms()), clamped to RAMP_MIN/MAX_INTERVAL: a
+    slow amp gets fewer, larger steps instead of a backlog. A ramp is dropped
+    when its zone reports a volume the ramp did not send (wall panel) or when
+    cancel() is called (a user command from HA).
+    """
+
+    def __init__(self, state: AxiumState, commands: CommandQueue, latency_ms: Callable[[], float | None]):
+        self._state = state
+        self._commands = commands
+        self._latency_ms = latency_ms
+        self._ramps: dict[int, _Ramp] = {}
+        self._task: asyncio.Task | None = None
+        self.steps_sent = 0
+
+    @property
+    def active(self) -> frozenset[int]:
+        return frozenset(self._ramps)
+
+    def start(self, targets: dict[int, int], duration: float) -> None:
+        """Fade each zone from its current volume to targets[zone] (raw) over duration seconds."""
+        # Volume-linked peers follow their group's ramp on the amp side
+        for zone in self._state.groups.cover(targets, LINK_VOLUME):
+            target = targets[zone]
+            current = self._state.zone(zone).volume
+            self._ramps[zone] = _Ramp(target if current is None else current, target, duration, current)
+        if self._ramps and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self, zone: int) -> None:
+        if self._ramps.pop(zone, None) is not None:
+            _LOGGER.debug("Volume ramp on zone %s cancelled", zone)
+
+    def close(self) -> None:
+        self._ramps.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _interval(self) -> float:
+        latency = self._latency_ms()
+        if latency is None:
+            return RAMP_MIN_INTERVAL
+        return min(max(RAMP_LATENCY_FACTOR * latency / 1000, RAMP_MIN_INTERVAL), RAMP_MAX_INTERVAL)
+
+    async def _run(self):
+        while self._ramps:
+            t_tick = time.monotonic()
+            lines: list[str] = []
+            for zone, ramp in list(self._ramps.items()):
+                current = self._state.zone(zone).volume
+                expected = ramp.expected
+                if current not in expected:
+                    _LOGGER.debug("Zone %s volume changed to %s outside the ramp; stopping it", zone, current)
+                    del self._ramps[zone]
+                    continue
+                # Steps older than the one the amp has reached will not be reported any more
+                while expected[0] != current:
+                    expected.popleft()
+                value = ramp.value_at(t_tick)
+                if value == ramp.target:
+                    del self._ramps[zone]
+                if value != current:
+                    expected.append(value)
+                    lines.append(f"04{encode_zone(zone)}{value:02X}")
+            if lines:
+                try:
+                    await self._commands.submit_many(lines)
+                    self.steps_sent += len(lines)
+                except Exception as e:
+                    _LOGGER.debug("Volume ramp step failed: %s", e)
+            await asyncio.sleep(max(self._interval() - (time.monotonic() - t_tick), 0))
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import json
+import time
+from collections import deque
+from typing import Any, Iterable, NamedTuple
+
+from .protocol import LineFramer, frame_text, parse_frame
+from .state import AxiumState
+
+# Trace format: one JSON object per line,
+#   {"t": <seconds since recording started>, "ep": "long" | "cgi", "data": "<raw text>"}
+# "long" entries are raw axiumlong.cgi chunks (frames may straddle entries);
+# "cgi" entries are complete axium.cgi POST response bodies.
+ENDPOINT_LONGPOLL = "long"
+ENDPOINT_CGI = "cgi"
+
+
+class FrameRecorder:
+    """In-memory capture of raw amp responses, capped at max_entries."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.entries: list[dict] = []
+        self.dropped = 0
+        self._t0 = time.monotonic()
+
+    def record(self, endpoint: str, data: bytes | str) -> None:
+        if len(self.entries) >= self.max_entries:
+            self.dropped += 1
+            return
+        if isinstance(data, bytes):
+            data = data.decode("latin-1")
+        self.entries.append({"t": round(time.monotonic() - self._t0, 4), "ep": endpoint, "data": data})
+
+
+# FrameRing.rx() result for a long-poll frame a later one made redundant
+SUPERSEDED = object()
+
+
+class FrameRing:
+    """
+    Always-on, fixed-size buffer of the most recent frames received and
+    command payloads sent. Recording is a tuple append (formatting happens only
+    in entries() / to_trace()), so it stays on with DEBUG logging off; memory
+    is capped at `size` entries.
+    """
+
+    def __init__(self, size: int = 1000):
+        self._buf: deque[tuple[float, str, str, str, Any]] = deque(maxlen=size)
+        self.total = 0
+
+    def rx(self, endpoint: str, line: str, result: Any) -> None:
+        """
+        result: the parsed frame, None for an unhandled opcode, the parse
+        exception, or SUPERSEDED for a frame collapsed before being applied.
+        """
+        self.total += 1
+        self._buf.append((time.time(), "rx", endpoint, line, result))
+
+    def tx(self, payload: bytes | str) -> None:
+        self.total += 1
+        if isinstance(payload, bytes):
+            payload = payload.decode("latin-1")
+        self._buf.append((time.time(), "tx", ENDPOINT_CGI, payload, None))
+
+    def entries(self) -> list[dict]:
+        out = []
+        for ts, direction, endpoint, data, result in self._buf:
+            entry = {"ts": round(ts, 3), "dir": direction, "ep": endpoint, "data": data}
+            if direction == "rx":
+                if result is SUPERSEDED:
+                    entry["superseded"] = True
+                elif result is None:
+                    entry["parsed"] = None
+                elif isinstance(result, Exception):
+                    entry["error"] = repr(result)
+                else:
+                    entry["parsed"] = {"type": type(result).__name__, **result._asdict()}
+            out.append(entry)
+        return out
+
+    def to_trace(self) -> list[dict]:
+        """Received frames in the replay trace format (see replay() / tools/replay_bench.py)."""
+        rx = [(ts, endpoint, line) for ts, direction, endpoint, line, _ in self._buf if direction == "rx"]
+        if not rx:
+            return []
+        t0 = rx[0][0]
+        return [{"t": round(ts - t0, 4), "ep": endpoint, "data": f"{line}\r\n"} for ts, endpoint, line in rx]
+
+
+def write_trace(path: str, entries: Iterable[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        for entry in entries:
+            fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def load_trace(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(ln) for ln in fh if ln.strip()]
+
+
+class ReplayStats(NamedTuple):
+    frames: int
+    parse_failures: int
+    seconds: float
+
+    @property
+    def frames_per_sec(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+
+def replay(entries: list[dict], state: AxiumState) -> ReplayStats:
+    """
+    Push a trace through the same framer / parser / state path the coordinator
+    uses, without Home Assistant. Long-poll chunks share one framer, as on a
+    single connection.
+    """
+    framer = LineFramer()
+    frames = failures = 0
+    t0 = time.perf_counter()
+    for entry in entries:
+        if entry["ep"] == ENDPOINT_LONGPOLL:
+            lines = framer.feed(entry["data"].encode("latin-1"))
+            failures += framer.rejected
+            framer.rejected = 0
+        else:
+            lines, rejected = frame_text(entry["data"])
+            failures += rejected
+        for line in lines:
+            frames += 1
+            try:
+                frame = parse_frame(line)
+                if frame is not None:
+                    state.apply(frame)
+            except Exception:
+                failures += 1
+    return ReplayStats(frames, failures, time.perf_counter() - t0)
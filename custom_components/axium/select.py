@@ -0,0 +1,37 @@
+from __future__ import annotations
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.select import SelectEntity
+
+from .const import CONF_PRESET_RECALL
+from .coordinator import AxiumCoordinator
+from .entity import AxiumPresetEntity
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
+    # The recall opcode is unconfirmed: without the opt-in, preset names are
+    # only shown read-only by the presets sensor, once it is enabled
+    if not entry.options.get(CONF_PRESET_RECALL, entry.data.get(CONF_PRESET_RECALL, False)):
+        return
+    data = hass.data["axium"][entry.entry_id]
+    coord: AxiumCoordinator = data["coordinator"]
+    async_add_entities([AxiumPresetSelect(coord)])
+
+class AxiumPresetSelect(AxiumPresetEntity, SelectEntity):
+    """Recall one of the amp's named presets. Presets are actions, so there is no current option."""
+
+    _attr_current_option = None
+
+    def __init__(self, coordinator: AxiumCoordinator):
+        super().__init__(coordinator)
+        self._attr_name = "Preset"
+        self._attr_unique_id = f"axium_{coordinator.host}_preset"
+
+    @property
+    def options(self) -> list[str]:
+        return self.preset_names
+
+    async def async_select_option(self, option: str) -> None:
+        for preset, name in self.coordinator.data.preset_names.items():
+            if name == option:
+                await self.coordinator.async_recall_preset(preset)
+                return
@@ -0,0 +1,91 @@
+from __future__ import annotations
+from datetime import timedelta
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .coordinator import AxiumCoordinator
+from .entity import AxiumPresetEntity, amp_device_info
+
+# Metrics move with every frame; sample them on a timer instead of per update
+SCAN_INTERVAL = timedelta(seconds=30)
+
+_TOTAL = SensorStateClass.TOTAL_INCREASING
+_GAUGE = SensorStateClass.MEASUREMENT
+
+# key, name, unit, state class, value
+SENSORS: tuple[tuple[str, str, str | None, SensorStateClass, Callable[[AxiumCoordinator], Any]], ...] = (
+    ("frames_received", "Frames received", None, _TOTAL, lambda c: c.frames_received),
+    ("updates_published", "State updates published", None, _TOTAL, lambda c: c.updates_published),
+    ("parse_failures", "Parse failures", None, _TOTAL, lambda c: c.metrics.parse_failures),
+    ("frame_time", "Frame handling time", "µs", _GAUGE, lambda c: c.metrics.as_dict()["handle_frame_mean_us"]),
+    ("http_latency", "HTTP latency", "ms", _GAUGE, lambda c: c.api.metrics.latency["cgi"].mean_ms),
+    ("http_latency_p95", "HTTP latency p95", "ms", _GAUGE, lambda c: c.api.metrics.latency["cgi"].percentile_ms(0.95)),
+    ("http_errors", "HTTP errors", None, _TOTAL, lambda c: c.api.metrics.errors),
+    ("http_timeouts", "HTTP timeouts", None, _TOTAL, lambda c: c.api.metrics.timeouts),
+    ("longpoll_reconnects", "Long-poll reconnects", None, _TOTAL, lambda c: c.metrics.reconnects),
+    ("longpoll_stalls", "Long-poll stalls", None, _TOTAL, lambda c: c.metrics.stalls),
+    ("longpoll_uptime", "Long-poll uptime", "s", _GAUGE, lambda c: c.metrics.uptime),
+)
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
+    data = hass.data["axium"][entry.entry_id]
+    coord: AxiumCoordinator = data["coordinator"]
+    async_add_entities([*(AxiumDiagnosticSensor(coord, *spec) for spec in SENSORS), AxiumPresetsSensor(coord)])
+
+
+class AxiumDiagnosticSensor(SensorEntity):
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = True
+
+    def __init__(self, coordinator: AxiumCoordinator, key: str, name: str, unit, state_class, value_fn):
+        self.coordinator = coordinator
+        self._value_fn = value_fn
+        self._attr_name = name
+        self._attr_unique_id = f"axium_{coordinator.host}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._key = key
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return amp_device_info(self.coordinator)
+
+    @property
+    def native_value(self):
+        return self._value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self._key == "frames_received":
+            return {"by_opcode": dict(self.coordinator.metrics.frames_by_opcode)}
+        return None
+
+
+class AxiumPresetsSensor(AxiumPresetEntity, SensorEntity):
+    """
+    The amp's preset names, read-only: the state is the count, the names are
+    an attribute. Disabled by default, so the names are only fetched once
+    it is enabled (or the recall select exists).
+    """
+
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator: AxiumCoordinator):
+        super().__init__(coordinator)
+        self._attr_name = "Presets"
+        self._attr_unique_id = f"axium_{coordinator.host}_presets"
+
+    @property
+    def native_value(self) -> int:
+        return len(self.coordinator.data.preset_names)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"presets": self.preset_names}
@@ -0,0 +1,277 @@
+from __future__ import annotations
+import logging
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, NamedTuple
+
+from .groups import LINK_POWER, LINK_SOURCE, LINK_VOLUME, GroupIndex
+from .protocol import (
+    GroupFrame,
+    MaxVolFrame,
+    MuteFrame,
+    PowerFrame,
+    PresetNameFrame,
+    SourceFrame,
+    SourceNameFrame,
+    VolumeFrame,
+    ZoneNameFrame,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_EMPTY: Mapping[int, str] = MappingProxyType({})
+
+
+class ZoneState(NamedTuple):
+    """Immutable per-zone record; a change replaces the record, never mutates it."""
+    power: str | None = None
+    volume: int | None = None
+    source: int | None = None
+    max_vol: int | None = 0xA0
+    name: str | None = None
+    source_names: Mapping[int, str] = _EMPTY  # per-zone overrides of the shared table
+    mute: bool | None = None  # None until the amp reports it (firmwares with 02 only)
+
+
+_DEFAULT_ZONE = ZoneState()
+
+
+class StateSnapshot:
+    """Read-only, versioned view of the whole amp handed to entities."""
+
+    __slots__ = ("version", "zones", "source_names", "preset_names")
+
+    def __init__(self, version: int, zones: Mapping[int, ZoneState], source_names: Mapping[int, str], preset_names: Mapping[int, str]):
+        self.version = version
+        self.zones = zones
+        self.source_names = source_names
+        self.preset_names = preset_names
+
+    def zone(self, zone: int) -> ZoneState:
+        return self.zones.get(zone, _DEFAULT_ZONE)
+
+    def source_name(self, zone: int, source: int) -> str | None:
+        names = self.zone(zone).source_names
+        if source in names:
+            return names[source]
+        return self.source_names.get(source)
+
+
+class Optimistic:
+    """A value shown ahead of the amp's confirmation, and what to revert to."""
+
+    __slots__ = ("value", "prev", "handle")
+
+    def __init__(self, prev):
+        self.value = None
+        self.prev = prev
+        self.handle = None  # rollback timer, owned by the coordinator
+
+
+class AxiumState:
+    """
+    Per-amp state model and frame applier, free of Home Assistant dependencies.
+
+    Each configured zone is one immutable ZoneState record; source names live in
+    one shared table (from 29FF broadcasts) with per-zone overrides. Changes
+    replace records and copy-on-write the name tables, so snapshot() can hand
+    out a consistent view without copying nested data, and a snapshot never
+    changes after it is taken. The fields changed per zone since the caller
+    last took `dirty` are collected there (zone -> field names, with
+    "group" for link changes); `metadata_changed` flags name/group changes
+    worth persisting.
+    """
+
+    def __init__(self, zones: Iterable[int]):
+        self._zones: dict[int, ZoneState] = {z: _DEFAULT_ZONE for z in zones}
+        self.source_names: dict[int, str] = {}
+        self.preset_names: dict[int, str] = {}
+        self.groups = GroupIndex()
+        # (field, zone) -> pending optimistic write awaiting a confirming frame
+        self.pending: dict[tuple[str, int], Optimistic] = {}
+        self.dirty: dict[int, set[str]] = {}
+        self.metadata_changed = False
+        self.version = 0
+        self._snapshot: StateSnapshot | None = None
+
+        # Parsed frame record type -> applier (see protocol.register_frame)
+        self._appliers = {
+            PowerFrame: self._apply_power,
+            SourceFrame: self._apply_source,
+            VolumeFrame: self._apply_volume,
+            MaxVolFrame: self._apply_max_vol,
+            ZoneNameFrame: self._apply_zone_name,
+            SourceNameFrame: self._apply_source_name,
+            PresetNameFrame: self._apply_preset_name,
+            GroupFrame: self._apply_group,
+            MuteFrame: self._apply_mute,
+        }
+
+    @property
+    def zones(self) -> list[int]:
+        return list(self._zones)
+
+    def zone(self, zone: int) -> ZoneState:
+        return self._zones.get(zone, _DEFAULT_ZONE)
+
+    def snapshot(self) -> StateSnapshot:
+        snap = self._snapshot
+        if snap is None or snap.version != self.version:
+            snap = self._snapshot = StateSnapshot(
+                self.version,
+                MappingProxyType(dict(self._zones)),
+                MappingProxyType(self.source_names),
+                MappingProxyType(self.preset_names),
+            )
+        return snap
+
+    def set(self, zone: int, field: str, value: Any) -> bool:
+        """Unconditionally set a field (configured zones only); True if it changed."""
+        rec = self._zones.get(zone)
+        if rec is None or getattr(rec, field) == value:
+            return False
+        self._zones[zone] = rec._replace(**{field: value})
+        self._mark_dirty(zone, field)
+        self.version += 1
+        return True
+
+    def _mark_dirty(self, zone: int, field: str) -> None:
+        fields = self.dirty.get(zone)
+        if fields is None:
+            self.dirty[zone] = {field}
+        else:
+            fields.add(field)
+
+    def update(self, field: str, zone: int, value: Any) -> None:
+        """Apply an amp-reported value, honouring a pending optimistic write for it."""
+        if self.pending:
+            pend = self.pending.get((field, zone))
+            if pend is not None:
+                if pend.value != value:
+                    # Stale echo of an older command (or an outside change): keep
+                    # showing the optimistic value, but roll back to this one
+                    pend.prev = value
+                    return
+                if pend.handle is not None:
+                    pend.handle.cancel()
+                del self.pending[(field, zone)]
+        self.set(zone, field, value)
+
+    def set_optimistic(self, field: str, zone: int, value: Any) -> Optimistic:
+        pend = self.pending.get((field, zone))
+        if pend is None:
+            pend = self.pending[(field, zone)] = Optimistic(getattr(self.zone(zone), field))
+        pend.value = value
+        self.set(zone, field, value)
+        return pend
+
+    def rollback(self, field: str, zone: int) -> Optimistic | None:
+        pend = self.pending.pop((field, zone), None)
+        if pend is not None:
+            self.set(zone, field, pend.prev)
+        return pend
+
+    def apply(self, frame) -> None:
+        apply = self._appliers.get(type(frame))
+        if apply is not None:
+            apply(frame)
+
+    # -- frame appliers ----------------------------------------------------------
+
+    def _apply_power(self, f: PowerFrame):
+        z = f.zone
+        if f.power is not None:
+            self.update("power", z, f.power)
+        if self.groups.options_of(z) & LINK_POWER:
+            power = self.zone(z).power
+            for peer in self.groups.peers(z):
+                self.update("power", peer, power)
+
+    def _apply_source(self, f: SourceFrame):
+        z = f.zone
+        if f.power_on:
+            self.update("power", z, "on")
+        self.update("source", z, f.source)
+        if self.groups.options_of(z) & LINK_SOURCE:
+            for peer in self.groups.peers(z):
+                self.update("source", peer, f.source)
+
+    def _apply_volume(self, f: VolumeFrame):
+        z = f.zone
+        self.update("volume", z, f.volume)
+        if self.groups.options_of(z) & LINK_VOLUME:
+            for peer in self.groups.peers(z):
+                self.update("volume", peer, f.volume)
+
+    def _apply_mute(self, f: MuteFrame):
+        self.update("mute", f.zone, f.muted)
+
+    def _apply_max_vol(self, f: MaxVolFrame):
+        self.set(f.zone, "max_vol", f.max_vol)
+
+    def _apply_zone_name(self, f: ZoneNameFrame):
+        prev = self.zone(f.zone).name
+        if self.set(f.zone, "name", f.name):
+            self.metadata_changed = True
+            _LOGGER.debug("ZONENAME parsed: zone=%s name=%s (prev=%s)", f.zone, f.name, prev)
+
+    def _apply_source_name(self, f: SourceNameFrame):
+        if f.zone is None:
+            # Broadcast: update the shared table and drop any per-zone override
+            changed = self.source_names.get(f.source) != f.name
+            if changed:
+                self.source_names = {**self.source_names, f.source: f.name}
+                self.version += 1
+                for z in self._zones:
+                    self._mark_dirty(z, "source_names")
+            for z, rec in self._zones.items():
+                if f.source in rec.source_names:
+                    rest = {k: v for k, v in rec.source_names.items() if k != f.source}
+                    changed |= self.set(z, "source_names", MappingProxyType(rest))
+        else:
+            rec = self._zones.get(f.zone)
+            changed = (
+                rec is not None
+                and (rec.source_names.get(f.source) or self.source_names.get(f.source)) != f.name
+                and self.set(f.zone, "source_names", MappingProxyType({**rec.source_names, f.source: f.name}))
+            )
+        if changed:
+            self.metadata_changed = True
+            _LOGGER.debug("SRCNAME parsed: zone=%s norm=%s name=%s", f.zone, f.source, f.name)
+
+    def _apply_preset_name(self, f: PresetNameFrame):
+        if self.preset_names.get(f.preset) != f.name:
+            self.preset_names = {**self.preset_names, f.preset: f.name}
+            self.version += 1
+            self.metadata_changed = True
+            _LOGGER.debug("PRESETNAME parsed: preset=%s name=%s", f.preset, f.name)
+
+    def _apply_group(self, f: GroupFrame):
+        affected = self.groups.assign(f.zones, f.options)
+        if affected:
+            for z in affected:
+                if z in self._zones:
+                    self._mark_dirty(z, "group")
+            self.version += 1
+            self.metadata_changed = True
+
+    # -- persistence -------------------------------------------------------------
+
+    def export_metadata(self) -> dict:
+        return {
+            "zone_names": {z: rec.name for z, rec in self._zones.items() if rec.name},
+            "source_names": self.source_names,
+            "zone_source_names": {z: dict(rec.source_names) for z, rec in self._zones.items() if rec.source_names},
+            "preset_names": self.preset_names,
+            "groups": self.groups.export(),
+        }
+
+    def load_metadata(self, data: Mapping[str, Any]) -> None:
+        for z, name in data.get("zone_names", {}).items():
+            self.set(int(z), "name", name)
+        self.source_names = {int(i): n for i, n in data.get("source_names", {}).items()}
+        for z, names in data.get("zone_source_names", {}).items():
+            self.set(int(z), "source_names", MappingProxyType({int(i): n for i, n in names.items()}))
+        self.preset_names = {int(p): n for p, n in data.get("preset_names", {}).items()}
+        for opts, members in data.get("groups", []):
+            self.groups.assign(members, opts)
+        self.version += 1
@@ -14,27 +14,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
 
 class AxiumPowerSwitch(AxiumEntity, SwitchEntity):
     _attr_icon = "mdi:power"
+    _zone_fields = frozenset({"power", "name"})
 
     def __init__(self, coordinator: AxiumCoordinator, zone: int):
         super().__init__(coordinator, zone)
         self._attr_name = f"Z{zone} Power"
-        self._attr_unique_id = f"axium_z{zone}_power"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_z{zone}_power"
 
     @property
     def name(self):
-        base = self.coordinator.zone_names.get(self.zone) or f"Axium Z{self.zone}"
+        base = self.zone_state.name or f"Axium Z{self.zone}"
         return f"{base} Power"
 
     @property
     def is_on(self) -> bool | None:
-        return self.coordinator.power.get(self.zone) == "on"
+        return self.zone_state.power == "on"
 
     async def async_turn_on(self, **kwargs):
-        await self.coordinator.api.send(f"01{encode_zone(self.zone)}01")
-        self.coordinator.power[self.zone] = "on"
-        self.async_write_ha_state()
+        await self.coordinator.async_send_command(f"01{encode_zone(self.zone)}01", self.zone, power="on")
 
     async def async_turn_off(self, **kwargs):
-        await self.coordinator.api.send(f"01{encode_zone(self.zone)}00")
-        self.coordinator.power[self.zone] = "off"
-        self.async_write_ha_state()
+        await self.coordinator.async_send_command(f"01{encode_zone(self.zone)}00", self.zone, power="off")
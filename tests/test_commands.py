@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from custom_components.axium.commands import CommandQueue
+
+
+class FakeApi:
+    """Records each POST; a POST only returns once release() is called."""
+
+    def __init__(self):
+        self.posts: list[list[str]] = []
+        self.gate = asyncio.Event()
+
+    async def send_lines(self, lines: list[str]) -> str:
+        self.posts.append(lines)
+        await self.gate.wait()
+        return "\n".join(lines)
+
+    def release(self):
+        self.gate.set()
+
+
+def test_latest_value_wins_while_in_flight():
+    async def run():
+        api = FakeApi()
+        queue = CommandQueue(api)
+        first = asyncio.create_task(queue.submit("040110"))
+        await asyncio.sleep(0)
+        # 0401 is in flight; these share one pending slot
+        second = asyncio.create_task(queue.submit("040120"))
+        third = asyncio.create_task(queue.submit("040130"))
+        await asyncio.sleep(0)
+        api.release()
+        results = await asyncio.gather(first, second, third)
+        return api, queue, results
+
+    api, queue, results = asyncio.run(run())
+    assert api.posts == [["040110"], ["040130"]]
+    assert results == ["040110", "040130", "040130"]
+    assert queue.coalesced == 1
+    assert queue.sent == 2
+
+
+def test_commands_queued_behind_a_post_share_one_batch():
+    async def run():
+        api = FakeApi()
+        queue = CommandQueue(api)
+        first = asyncio.create_task(queue.submit("040110"))
+        await asyncio.sleep(0)
+        rest = [asyncio.create_task(queue.submit(line)) for line in ("040210", "010101")]
+        await asyncio.sleep(0)
+        api.release()
+        await asyncio.gather(first, *rest)
+        return api
+
+    assert asyncio.run(run()).posts == [["040110"], ["040210", "010101"]]
+
+
+def test_close_cancels_in_flight_and_pending_waiters():
+    async def run():
+        api = FakeApi()
+        queue = CommandQueue(api)
+        in_flight = asyncio.create_task(queue.submit("040110"))
+        await asyncio.sleep(0)
+        pending = asyncio.create_task(queue.submit("040120"))
+        await asyncio.sleep(0)
+        queue.close()
+        for task in (in_flight, pending):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        return api
+
+    assert asyncio.run(run()).posts == [["040110"]]
+
+
+def test_send_error_reaches_every_waiter():
+    class FailingApi:
+        async def send_lines(self, lines):
+            raise ConnectionError("down")
+
+    async def run():
+        queue = CommandQueue(FailingApi())
+        return await asyncio.gather(queue.submit("040110"), queue.submit("040210"), return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(run())] == [ConnectionError, ConnectionError]
@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+
+from custom_components.axium.const import DOMAIN
+from custom_components.axium.coordinator import AxiumCoordinator
+from custom_components.axium.diagnostics import async_get_config_entry_diagnostics
+
+
+async def _diagnostics(config_dir: str) -> dict:
+    hass = HomeAssistant(config_dir)
+    coordinator = AxiumCoordinator(hass, None, "192.0.2.10", [1, 2], 3)
+    for line in ("040120", "1C014B69746368656E00", "290101000000545600", "300101020102", "3C01FF"):
+        coordinator._handle_frame(line)
+    entry = SimpleNamespace(
+        entry_id="entry",
+        data={"host": "192.0.2.10", "zones": [1, 2], "unique_prefix": "axium_192.0.2.10"},
+    )
+    hass.data[DOMAIN] = {"entry": {"coordinator": coordinator}}
+    try:
+        return await async_get_config_entry_diagnostics(hass, entry)
+    finally:
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+
+
+def test_payload_is_json_serializable(tmp_path):
+    payload = asyncio.run(_diagnostics(str(tmp_path)))
+    json_bytes(payload)
+    assert list(payload["state"]["zones"][1]["source_names"].values()) == ["TV"]
+    assert payload["recent_frames"]
+
+
+def test_host_is_redacted(tmp_path):
+    payload = asyncio.run(_diagnostics(str(tmp_path)))
+    assert "192.0.2.10" not in json_bytes(payload["entry"]).decode()
+
+
+def test_rejected_reply_lines_count_as_parse_failures(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        coordinator = AxiumCoordinator(hass, None, "192.0.2.10", [1], 3)
+        coordinator._handle_text("040120\r\ngarbage\r\n", "TEST")
+        metrics = coordinator.diagnostics()
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+        return metrics
+
+    metrics = asyncio.run(run())
+    assert metrics["frames_received"] == 1
+    assert metrics["stream"]["parse_failures"] == 1
+
+
+def test_superseded_frames_stay_in_recent_frames(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        coordinator = AxiumCoordinator(hass, None, "192.0.2.10", [1], 3)
+        await coordinator._queue_frames(["040110", "040120", "040130"])
+        await asyncio.sleep(0)
+        entries = coordinator.ring.entries()
+        metrics = coordinator.diagnostics()
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+        return entries, metrics
+
+    entries, metrics = asyncio.run(run())
+    assert [e["data"] for e in entries] == ["040110", "040120", "040130"]
+    assert [e.get("superseded", False) for e in entries] == [True, True, False]
+    assert metrics["frames_received"] == 3
+    assert metrics["stream"]["frames_superseded"] == 2
@@ -0,0 +1,48 @@
+from custom_components.axium.groups import LINK_SOURCE, LINK_VOLUME, GroupIndex
+
+
+def test_assign_builds_peers():
+    groups = GroupIndex()
+    assert groups.assign([1, 2, 3], LINK_VOLUME) == {1, 2, 3}
+    assert groups.peers(1) == {2, 3}
+    assert groups.options_of(2) == LINK_VOLUME
+    assert groups.peers(4) == frozenset()
+
+
+def test_repeated_frame_is_a_no_op():
+    groups = GroupIndex()
+    groups.assign([1, 2], LINK_VOLUME)
+    g = groups.group_of(1)
+    assert groups.assign([2, 1], LINK_VOLUME) == set()
+    assert groups.group_of(1) == g
+    # Different options are a real change
+    assert groups.assign([1, 2], LINK_SOURCE) == {1, 2}
+    assert groups.options_of(1) == LINK_SOURCE
+
+
+def test_dissolved_group_id_is_reclaimed():
+    groups = GroupIndex(max_groups=2)
+    groups.assign([1, 2], 0)
+    groups.assign([3, 4], 0)
+    # Zone 2 leaving alone dissolves 1+2 and frees its ID
+    assert groups.assign([2], 0) == {1, 2}
+    assert groups.group_of(1) is None
+    groups.assign([5, 6], 0)
+    assert groups.group_of(5) is not None
+    assert len(groups.members) == 2
+
+
+def test_leaving_a_larger_group_keeps_the_rest():
+    groups = GroupIndex()
+    groups.assign([1, 2, 3], 0)
+    assert groups.assign([3, 4], 0) == {3, 4}
+    assert groups.peers(1) == {2}
+    assert groups.peers(3) == {4}
+    assert sorted(groups.export()) == [[0, [1, 2]], [0, [3, 4]]]
+
+
+def test_cover_sends_one_zone_per_linked_group():
+    groups = GroupIndex()
+    groups.assign([1, 2], LINK_VOLUME)
+    groups.assign([3, 4], LINK_SOURCE)
+    assert groups.cover([1, 2, 3, 4, 5], LINK_VOLUME) == [1, 3, 4, 5]
@@ -0,0 +1,58 @@
+from custom_components.axium.protocol import LineFramer, collapse_frames, frame_text, split_frames
+
+
+def test_framer_reassembles_split_chunks():
+    framer = LineFramer()
+    assert framer.feed(b"0401") == []
+    assert framer.feed(b"20\r\n01") == ["040120"]
+    assert framer.feed(b"01") == []
+    assert framer.feed(b"01\n") == ["010101"]
+
+
+def test_framer_uppercases_and_rejects_non_hex():
+    framer = LineFramer()
+    assert framer.feed(b"04012a\nhello\n0x\n") == ["04012A"]
+    assert framer.rejected == 1
+
+
+def test_framer_flush_returns_unterminated_tail():
+    framer = LineFramer()
+    assert framer.feed(b"040120\n0402") == ["040120"]
+    assert framer.flush() == ["0402"]
+    assert framer.flush() == []
+
+
+def test_framer_drops_oversized_tail():
+    framer = LineFramer(max_line=8)
+    assert framer.feed(b"0401202020") == []
+    assert framer.rejected == 1
+    assert framer.feed(b"\n040130\n") == ["040130"]
+
+
+def test_split_frames():
+    assert split_frames("040120\r\n010101") == ["040120", "010101"]
+
+
+def test_collapse_keeps_latest_per_zone_in_order():
+    lines = ["040110", "040210", "040120", "010101", "040130"]
+    assert collapse_frames(lines) == ["040210", "010101", "040130"]
+
+
+def test_collapse_does_not_cross_group_barrier():
+    lines = ["040110", "300101020102", "040120"]
+    assert collapse_frames(lines) == lines
+
+
+def test_collapse_never_drops_kept_frames():
+    lines = ["040110", "040120", "040210", "040220"]
+    assert collapse_frames(lines, keep={"0401"}) == ["040110", "040120", "040220"]
+
+
+def test_collapse_keeps_power_on_source_report():
+    # 0x80 in a source report also powers the zone on
+    lines = ["030181", "030102"]
+    assert collapse_frames(lines) == lines
+
+
+def test_frame_text_counts_rejected_lines():
+    assert frame_text("040120\r\nnot hex\r\n0101") == (["040120", "0101"], 1)
@@ -0,0 +1,46 @@
+import asyncio
+
+from custom_components.axium.protocol import parse_frame
+from custom_components.axium.ramp import RampEngine
+from custom_components.axium.state import AxiumState
+
+
+class SilentQueue:
+    """Accepts ramp steps; the amp's echoes are applied by the test."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    async def submit_many(self, lines: list[str]) -> str:
+        self.lines.extend(lines)
+        return ""
+
+
+def _ramp(echo_after: int | None, outside: str | None = None):
+    async def run():
+        state = AxiumState([1])
+        state.apply(parse_frame("040110"))
+        queue = SilentQueue()
+        ramps = RampEngine(state, queue, lambda: None)
+        ramps.start({1: 0x40}, 1.0)
+        for tick in range(4):
+            await asyncio.sleep(0.11)
+            if tick == echo_after:
+                state.apply(parse_frame(queue.lines[0]))
+        if outside is not None:
+            state.apply(parse_frame(outside))
+            await asyncio.sleep(0.11)
+        active = ramps.active
+        ramps.close()
+        return active
+
+    return asyncio.run(run())
+
+
+def test_lagging_echo_does_not_stop_the_ramp():
+    assert _ramp(echo_after=None) == {1}
+    assert _ramp(echo_after=2) == {1}
+
+
+def test_outside_change_stops_the_ramp():
+    assert _ramp(echo_after=2, outside="040105") == frozenset()
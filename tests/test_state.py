@@ -0,0 +1,53 @@
+from custom_components.axium.protocol import parse_frame
+from custom_components.axium.state import AxiumState
+
+
+def _apply(state: AxiumState, *lines: str) -> None:
+    for line in lines:
+        state.apply(parse_frame(line))
+
+
+def test_frame_updates_state_and_marks_dirty():
+    state = AxiumState([1, 2])
+    _apply(state, "040120")
+    assert state.zone(1).volume == 0x20
+    assert state.dirty == {1: {"volume"}}
+
+
+def test_optimistic_value_confirmed_by_matching_frame():
+    state = AxiumState([1])
+    _apply(state, "040110")
+    state.set_optimistic("volume", 1, 0x30)
+    assert state.zone(1).volume == 0x30
+    _apply(state, "040130")
+    assert not state.pending
+    assert state.zone(1).volume == 0x30
+
+
+def test_stale_echo_keeps_optimistic_value_and_updates_rollback_target():
+    state = AxiumState([1])
+    _apply(state, "040110")
+    state.set_optimistic("volume", 1, 0x30)
+    _apply(state, "040120")
+    assert state.zone(1).volume == 0x30
+    state.rollback("volume", 1)
+    assert state.zone(1).volume == 0x20
+    assert not state.pending
+
+
+def test_rollback_restores_previous_value():
+    state = AxiumState([1])
+    _apply(state, "040110")
+    state.set_optimistic("volume", 1, 0x30)
+    assert state.rollback("volume", 1) is not None
+    assert state.zone(1).volume == 0x10
+    assert state.rollback("volume", 1) is None
+
+
+def test_snapshot_is_immutable_and_cached():
+    state = AxiumState([1])
+    snap = state.snapshot()
+    assert state.snapshot() is snap
+    _apply(state, "040120")
+    assert snap.zone(1).volume != 0x20
+    assert state.snapshot().zone(1).volume == 0x20
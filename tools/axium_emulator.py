@@ -0,0 +1,267 @@
+"""
+Local Axium amplifier emulator for load and latency testing.
+
+Serves axium.cgi (command POSTs, multi-line batches, snapshot replies) and
+axiumlong.cgi (streamed event feed) with a configurable zone count, background
+"wall panel" event rate, response delay and long-poll connection drops.
+
+    python tools/axium_emulator.py --port 8080 --zones 96 --event-rate 20 --delay 0.02
+
+Only needs aiohttp; the zone/source encoding is imported from the integration.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+
+from aiohttp import web
+
+from bench_parser import load_axium_module
+
+protocol = load_axium_module("protocol")
+encode_zone = protocol.encode_zone
+decode_zone = protocol.decode_zone
+
+SOURCE_NAMES = ["Sonos", "TV", "Radio", "Aux", "Spotify", "Phono", "Bluetooth", "Tuner"]
+PRESET_NAMES = ["Morning", "Party", "Quiet"]
+_STALL = "stall"
+
+
+def _hex(text: str) -> str:
+    return text.encode().hex().upper() + "00"
+
+
+class EmulatedZone:
+    __slots__ = ("power", "mute", "volume", "source", "max_vol", "name")
+
+    def __init__(self, zone: int):
+        self.power = False
+        self.mute = False
+        self.volume = 0x20
+        self.source = 0
+        self.max_vol = 0xA0
+        self.name = f"Zone {zone}"
+
+
+class AxiumEmulator:
+    """In-process emulated amp; build the app with make_app() or run main()."""
+
+    def __init__(
+        self,
+        zones: int = 8,
+        event_rate: float = 0.0,
+        delay: float = 0.0,
+        drop_every: float = 0.0,
+        keepalive: float = 5.0,
+        seed: int | None = None,
+        mute: bool = False,
+        model: str | None = None,
+    ):
+        if not 1 <= zones <= 96:
+            raise ValueError("zones must be 1..96")
+        self.zones = {z: EmulatedZone(z) for z in range(1, zones + 1)}
+        self.event_rate = event_rate
+        self.delay = delay
+        self.drop_every = drop_every
+        self.keepalive = keepalive
+        self.rng = random.Random(seed)
+        # Optional firmware features: 02 mute queries/commands and a 3C model reply
+        self.mute = mute
+        self.model = model
+        self.refuse_streams = False  # axiumlong.cgi answers 503 (broken long-poll firmware)
+        self._streams: set[asyncio.Queue] = set()
+        self._tasks: list[asyncio.Task] = []
+        self.posts = 0
+        self.lines = 0
+        self.drops = 0
+        self.recalls = 0
+
+    # -- state / frames ----------------------------------------------------------
+
+    def state_frames(self, z: int, ops: str = "30010304") -> list[str]:
+        zs = self.zones[z]
+        zh = encode_zone(z)
+        out = []
+        for op in (ops[i:i + 2] for i in range(0, len(ops), 2)):
+            if op == "30":
+                out.append(f"30{zh}01")
+            elif op == "01":
+                out.append(f"01{zh}{'01' if zs.power else '00'}")
+            elif op == "02" and self.mute:
+                out.append(f"02{zh}{'01' if zs.mute else '00'}")
+            elif op == "03":
+                enc = protocol.SOURCE_ENCODE[zs.source]
+                out.append(f"03{zh}{(enc | 0x80) if zs.power else enc:02X}")
+            elif op == "04":
+                out.append(f"04{zh}{zs.volume:02X}")
+            elif op == "0D":
+                out.append(f"0D{zh}{zs.max_vol:02X}")
+        return out
+
+    def name_frames(self, z: int | None) -> list[str]:
+        zones = self.zones if z is None else [z]
+        return [f"1C{encode_zone(zz)}{_hex(self.zones[zz].name)}" for zz in zones if zz in self.zones]
+
+    def broadcast(self, frames: list[str]) -> None:
+        payload = "".join(f"{f}\r\n" for f in frames)
+        for q in self._streams:
+            q.put_nowait(payload)
+
+    def set_zone(self, z: int, field: str, value) -> list[str]:
+        """Change emulated state (as a wall panel would) and emit the events."""
+        setattr(self.zones[z], field, value)
+        ops = {"power": "01", "mute": "02", "volume": "04", "source": "03", "max_vol": "0D"}[field]
+        frames = self.state_frames(z, ops)
+        self.broadcast(frames)
+        return frames
+
+    def handle_line(self, line: str) -> list[str]:
+        line = line.strip().upper()
+        if len(line) < 4:
+            return []
+        op, zh, data = line[:2], line[2:4], line[4:]
+        z = decode_zone(zh)
+        if op == "1B":
+            return self.name_frames(None if zh == "FF" else z)
+        if op == "29":
+            return [f"29{zh}{protocol.SOURCE_ENCODE[i]:02X}000000{_hex(n)}" for i, n in enumerate(SOURCE_NAMES)]
+        if op == "2B" and len(data) >= 2:
+            idx = int(data[:2], 16) - 2
+            return [f"2AFF{idx + 1:02X}{_hex(PRESET_NAMES[idx])}"] if 0 <= idx < len(PRESET_NAMES) else []
+        if op == "2C" and len(data) >= 2:
+            # Preset recall: only counted. What a real amp does with 2C is not
+            # known, so no zone state is changed
+            idx = int(data[:2], 16) - 2
+            if 0 <= idx < len(PRESET_NAMES):
+                self.recalls += 1
+            return []
+        if z not in self.zones:
+            return []
+        if op == "3C":
+            return [f"3C{zh}{self.model}"] if self.model and not data else []
+        if not data:
+            # Query: report current state for this opcode
+            return self.state_frames(z, op) if op in ("30", "01", "02", "03", "04", "0D") else []
+        val = int(data[:2], 16)
+        if op == "01":
+            return self.set_zone(z, "power", val in (1, 7))
+        if op == "02" and self.mute:
+            return self.set_zone(z, "mute", bool(val & 0x01))
+        if op == "03":
+            if val & 0x80:
+                self.zones[z].power = True
+            return self.set_zone(z, "source", protocol.SOURCE_DECODE[val & 0x1F])
+        if op == "04":
+            return self.set_zone(z, "volume", min(val, self.zones[z].max_vol))
+        return []
+
+    # -- HTTP --------------------------------------------------------------------
+
+    async def handle_cgi(self, request: web.Request) -> web.Response:
+        body = (await request.read()).decode("latin-1")
+        self.posts += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        lines = [ln for ln in body.replace("\r", "").split("\n") if ln.strip()]
+        self.lines += len(lines)
+        if not lines:
+            # Empty POST: snapshot dump of every zone
+            out = [f for z in self.zones for f in self.state_frames(z, "01030D04")]
+        else:
+            out = [f for ln in lines for f in self.handle_line(ln)]
+        return web.Response(text="".join(f"{f}\r\n" for f in out), content_type="application/x-axium")
+
+    async def handle_long(self, request: web.Request) -> web.StreamResponse:
+        if self.refuse_streams:
+            return web.Response(status=503)
+        resp = web.StreamResponse(headers={"Content-Type": "application/x-axium"})
+        await resp.prepare(request)
+        q: asyncio.Queue = asyncio.Queue()
+        self._streams.add(q)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.drop_every if self.drop_every else None
+        try:
+            while True:
+                timeout = self.keepalive
+                if deadline is not None:
+                    timeout = min(timeout, max(deadline - loop.time(), 0))
+                try:
+                    payload = await asyncio.wait_for(q.get(), timeout)
+                except asyncio.TimeoutError:
+                    payload = "38FF\r\n"  # keepalive
+                if payload == _STALL:
+                    # Half-open connection: keep the socket but never write again
+                    while request.transport is not None and not request.transport.is_closing():
+                        await asyncio.sleep(0.1)
+                    break
+                if payload is None or (deadline is not None and loop.time() >= deadline):
+                    self.drops += 1
+                    request.transport.close()  # abrupt drop, like an amp reboot
+                    break
+                await resp.write(payload.encode())
+        finally:
+            self._streams.discard(q)
+        return resp
+
+    def drop_streams(self) -> None:
+        """Force every open long-poll connection closed."""
+        for q in list(self._streams):
+            q.put_nowait(None)
+
+    def stall_streams(self) -> None:
+        """Silence every open long-poll connection without closing it."""
+        for q in list(self._streams):
+            q.put_nowait(_STALL)
+
+    async def _event_loop(self):
+        zones = list(self.zones)
+        while True:
+            if self.event_rate <= 0:
+                await asyncio.sleep(0.1)  # paused
+                continue
+            await asyncio.sleep(self.rng.expovariate(self.event_rate))
+            z = self.rng.choice(zones)
+            kind = self.rng.random()
+            if kind < 0.8:
+                self.set_zone(z, "volume", self.rng.randrange(0, self.zones[z].max_vol))
+            elif kind < 0.9:
+                self.set_zone(z, "source", self.rng.randrange(8))
+            else:
+                self.set_zone(z, "power", not self.zones[z].power)
+
+    async def _on_startup(self, app):
+        self._tasks.append(asyncio.get_running_loop().create_task(self._event_loop()))
+
+    async def _on_cleanup(self, app):
+        for t in self._tasks:
+            t.cancel()
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/axium.cgi", self.handle_cgi)
+        app.router.add_get("/axiumlong.cgi", self.handle_long)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Emulate an Axium amplifier's HTTP interface.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--zones", type=int, default=8, help="1..96")
+    ap.add_argument("--event-rate", type=float, default=0.0, help="wall-panel events per second")
+    ap.add_argument("--delay", type=float, default=0.0, help="seconds before each POST reply")
+    ap.add_argument("--drop-every", type=float, default=0.0, help="drop long-poll streams after N seconds")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--mute", action="store_true", help="firmware answers 02 mute queries")
+    ap.add_argument("--model", help="raw hex data for 3C model replies (default: no reply)")
+    args = ap.parse_args(argv)
+    emu = AxiumEmulator(
+        args.zones, args.event_rate, args.delay, args.drop_every, seed=args.seed, mute=args.mute, model=args.model
+    )
+    web.run_app(emu.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Micro-benchmark: table-driven protocol.parse_frame vs. the original inline
+_handle_frame decode path (int(..., 16) + decode_zone + DECODE_SOURCE_MAP).
+
+Runs without Home Assistant installed:
+
+    python tools/bench_parser.py [--frames 200000]
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import os
+import sys
+import time
+import types
+
+_PKG_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "custom_components", "axium")
+
+
+def load_axium_module(name: str):
+    """Import custom_components/axium/<name>.py without running the HA-bound __init__."""
+    if "axium_offline" not in sys.modules:
+        pkg = types.ModuleType("axium_offline")
+        pkg.__path__ = [os.path.abspath(_PKG_DIR)]
+        sys.modules["axium_offline"] = pkg
+    return importlib.import_module(f"axium_offline.{name}")
+
+
+protocol = load_axium_module("protocol")
+
+SAMPLE = [
+    "010101", "01C206", "030283", "030405", "040140", "04A27F", "0D01A0",
+    "1C014B69746368656E00", "29FF0200000054560000", "2AFF024D6F726E696E67",
+    "300101010203", "38FF",
+]
+
+
+# --- original decode path, kept verbatim in spirit as the baseline -----------
+
+def _legacy_decode_zone(z_hex):
+    try:
+        z = int(z_hex, 16)
+    except ValueError:
+        return None
+    if z != 0xFF:
+        z &= ~0x20
+        top = z & 0xC0
+        if top == 0x80:
+            return 32 + (z & 0x1F)
+        if top == 0xC0:
+            return 64 + (z & 0x1F)
+        if top == 0x40:
+            return None
+    return z
+
+
+_LEGACY_SRC = {0: 4, 1: 5, 2: 6, 3: 3, 4: 7, 5: 0, 6: 1, 7: 2}
+
+
+def legacy_parse(line):
+    line = line.strip().upper()
+    if len(line) < 4:
+        return None
+    if any(c not in "0123456789ABCDEF" for c in line):
+        return None
+    cmd = line[:2]
+    zone_raw = line[2:4] if len(line) >= 4 else None
+    z = _legacy_decode_zone(zone_raw) if zone_raw else None
+    data = line[4:]
+    if cmd == "01" and len(data) >= 2:
+        d = data[:2]
+        return (z, "on" if d in ("01", "07") else "off" if d in ("00", "06") else None)
+    elif cmd == "03" and len(data) >= 2:
+        val = int(data[:2], 16)
+        on = bool(val & 0x80)
+        if on:
+            val &= 0x1F
+        return (z, _LEGACY_SRC.get(val, val), on)
+    elif cmd == "04" and len(data) >= 2:
+        return (z, int(data[:2], 16))
+    elif cmd == "0D" and len(data) >= 2:
+        return (z, int(data[:2], 16))
+    elif cmd == "1C":
+        data2 = data[:-1] if len(data) % 2 else data
+        name = bytes.fromhex(data2).split(b"\x00", 1)[0].decode("utf-8", errors="ignore").strip()
+        return (z, name)
+    elif cmd == "29" and len(data) >= 2:
+        enc = int(data[:2], 16)
+        raw = data[8:] if len(data) >= 8 else ""
+        if len(raw) % 2 == 1:
+            raw = raw[:-1]
+        return (z, _LEGACY_SRC.get(enc, enc), bytes.fromhex(raw).decode(errors="ignore").strip("\x00 ").strip())
+    elif cmd == "2A" and len(data) >= 2:
+        raw = data[2:]
+        if len(raw) % 2 == 1:
+            raw = raw[:-1]
+        return (int(data[:2], 16) - 1, bytes.fromhex(raw).decode(errors="ignore").strip("\x00 ").strip())
+    elif cmd == "30" and len(data) >= 2:
+        opts = int(data[:2], 16)
+        rest = data[2 * (5 if (opts & 0x80) else 1):]
+        zones = []
+        for i in range(0, len(rest), 2):
+            zz = rest[i:i + 2]
+            if len(zz) < 2:
+                break
+            dz = _legacy_decode_zone(zz)
+            if dz is not None:
+                zones.append(dz)
+        return (opts, zones)
+    return None
+
+
+def _run(fn, frames) -> float:
+    t0 = time.perf_counter()
+    for line in frames:
+        fn(line)
+    return len(frames) / (time.perf_counter() - t0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--frames", type=int, default=200_000)
+    args = ap.parse_args(argv)
+
+    frames = (SAMPLE * (args.frames // len(SAMPLE) + 1))[:args.frames]
+    # The framer already validates/upper-cases, so time it as part of the new path
+    blob = ("\r\n".join(frames) + "\r\n").encode()
+
+    def new_path():
+        framer = protocol.LineFramer()
+        parse = protocol.parse_frame
+        for line in framer.feed(blob):
+            parse(line)
+
+    t0 = time.perf_counter()
+    new_path()
+    new_fps = len(frames) / (time.perf_counter() - t0)
+    parse_fps = _run(protocol.parse_frame, frames)
+    legacy_fps = _run(legacy_parse, frames)
+
+    print(f"frames:              {len(frames)}")
+    print(f"legacy _handle_frame: {legacy_fps:12,.0f} frames/s")
+    print(f"parse_frame:          {parse_fps:12,.0f} frames/s  ({parse_fps / legacy_fps:.2f}x)")
+    print(f"framer+parse_frame:   {new_fps:12,.0f} frames/s  ({new_fps / legacy_fps:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
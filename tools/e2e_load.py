@@ -0,0 +1,170 @@
+"""
+End-to-end load / latency run: AxiumApi + AxiumCoordinator against the local
+emulator (tools/axium_emulator.py) over real HTTP.
+
+    python tools/e2e_load.py [--zones 96] [--event-rate 50] [--delay 0.02] [--commands 50]
+
+Measures startup time, command-to-confirmed-state latency, how stale state
+is after a long-poll reconnect, how fast a silently stalled stream is
+detected, and how the polling fallback tracks changes while the long-poll
+is refused. Needs homeassistant and aiohttp installed (the
+coordinator runs on a bare HomeAssistant core instance; no config entry).
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+_TOOLS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _TOOLS)
+sys.path.insert(0, os.path.dirname(_TOOLS))
+
+from axium_emulator import AxiumEmulator  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from custom_components.axium.const import LONGPOLL_BACKOFF_MAX, UNAVAILABLE_GRACE  # noqa: E402
+from custom_components.axium.coordinator import AxiumCoordinator, encode_zone  # noqa: E402
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else float("nan")
+
+
+def _mismatched(emu: AxiumEmulator, coord: AxiumCoordinator) -> list[int]:
+    out = []
+    for z, ez in emu.zones.items():
+        rec = coord.state.zone(z)
+        if rec.volume != ez.volume or rec.source != ez.source or rec.power != ("on" if ez.power else "off"):
+            out.append(z)
+    return out
+
+
+async def _wait_until(pred, timeout: float, step: float = 0.005) -> float | None:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        if pred():
+            return time.perf_counter() - t0
+        await asyncio.sleep(step)
+    return None
+
+
+async def run(args) -> None:
+    emu = AxiumEmulator(args.zones, args.event_rate, args.delay, keepalive=args.idle_timeout / 4, seed=1)
+    runner = web.AppRunner(emu.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        coord = AxiumCoordinator(
+            hass, None, f"127.0.0.1:{port}", list(emu.zones), 3, longpoll_idle_timeout=args.idle_timeout
+        )
+
+        # 1) Startup
+        t0 = time.perf_counter()
+        await coord.async_config_entry_first_refresh()
+        startup = time.perf_counter() - t0
+        hydrated = await _wait_until(lambda: "total" in coord.startup_timings, 60)
+        print(
+            f"startup: setup {startup * 1000:.1f} ms, state hydrated after "
+            f"{(startup + (hydrated or 0)) * 1000:.1f} ms  phases={coord.startup_timings}  posts={emu.posts}"
+        )
+        await _wait_until(lambda: bool(emu._streams), 5)
+
+        # 2) Command -> confirmed state latency
+        lat = []
+        zones = list(emu.zones)
+        for i in range(args.commands):
+            z = zones[i % len(zones)]
+            vol = (emu.zones[z].volume + 7) % 0x90
+            t0 = time.perf_counter()
+            await coord.async_send_command(f"04{encode_zone(z)}{vol:02X}", z, volume=vol)
+            done = await _wait_until(lambda: ("volume", z) not in coord.state.pending, 5)
+            if done is not None:
+                lat.append(time.perf_counter() - t0)
+        if lat:
+            print(
+                f"command->state: n={len(lat)} median={statistics.median(lat) * 1000:.1f} ms "
+                f"p95={_pct(lat, 0.95) * 1000:.1f} ms max={max(lat) * 1000:.1f} ms"
+            )
+
+        # 3) Staleness after a long-poll drop with changes made during the outage
+        emu.event_rate = 0  # pause the wall panel so only outage changes count
+        emu.drop_streams()
+        await asyncio.sleep(0.05)
+        for z in zones[: max(1, len(zones) // 4)]:
+            emu.zones[z].volume = (emu.zones[z].volume + 11) % 0x90  # wall panel, no event delivered
+        stale = _mismatched(emu, coord)
+        converged = await _wait_until(lambda: not _mismatched(emu, coord), args.stale_timeout, 0.05)
+        left = _mismatched(emu, coord)
+        print(
+            f"reconnect: {len(stale)} zones stale at drop; "
+            + (f"converged after {converged:.2f} s" if converged is not None
+               else f"{len(left)} still stale after {args.stale_timeout:.0f} s")
+        )
+
+        # 4) Half-open stream: the amp stops writing but the socket stays up
+        await _wait_until(lambda: coord.metrics.connected_since is not None, 5)
+        stalls = coord.metrics.stalls
+        emu.stall_streams()
+        detected = await _wait_until(lambda: coord.metrics.stalls > stalls, args.idle_timeout * 3, 0.05)
+        back = await _wait_until(lambda: coord.metrics.connected_since is not None, 10, 0.05)
+        print(
+            "stall: "
+            + (f"detected after {detected:.2f} s (idle timeout {args.idle_timeout:g} s)"
+               if detected is not None else "not detected")
+            + ("" if back is None else f", reconnected {back:.2f} s later; connected={coord.connected}")
+        )
+
+        # 5) Long-poll refused: polling takes over, then hands back to push
+        coord.async_add_listener(lambda: None)  # stands in for entities (refreshes need a listener)
+        emu.refuse_streams = True
+        emu.drop_streams()
+        fallback = await _wait_until(lambda: coord.polling, UNAVAILABLE_GRACE + 10, 0.05)
+        z = zones[0]
+        emu.zones[z].volume = (emu.zones[z].volume + 5) % 0x90  # no stream to deliver it
+        seen = await _wait_until(lambda: not _mismatched(emu, coord), coord.scan_interval * 2 + 2, 0.05)
+        emu.refuse_streams = False
+        pushed = await _wait_until(lambda: coord.connected and not coord.polling, LONGPOLL_BACKOFF_MAX + 5, 0.05)
+        print(
+            "fallback: "
+            + (f"polling after {fallback:.2f} s" if fallback is not None else "polling never started")
+            + (f", change seen after {seen:.2f} s" if seen is not None else ", change not seen")
+            + (f", back to push {pushed:.2f} s after recovery" if pushed is not None else ", still polling")
+            + f"; polls={coord.polls}"
+        )
+
+        print(
+            f"frames received={coord.frames_received} updates published={coord.updates_published} "
+            f"emulator posts={emu.posts} lines={emu.lines} drops={emu.drops}"
+        )
+        await coord.async_shutdown()
+        await hass.async_stop(force=True)
+    await runner.cleanup()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="End-to-end load/latency run against the Axium emulator.")
+    ap.add_argument("--zones", type=int, default=8)
+    ap.add_argument("--event-rate", type=float, default=0.0)
+    ap.add_argument("--delay", type=float, default=0.0, help="emulated POST reply delay (s)")
+    ap.add_argument("--commands", type=int, default=40)
+    ap.add_argument("--stale-timeout", type=float, default=10.0)
+    ap.add_argument("--idle-timeout", type=float, default=2.0, help="coordinator long-poll idle timeout (s)")
+    ap.add_argument("--debug", action="store_true")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Offline replay benchmark: push recorded axium.cgi / axiumlong.cgi traces through
+the integration's framer, parser and state store, without Home Assistant.
+
+    python tools/replay_bench.py [trace.jsonl ...] [--repeat 200] [--zones 1-8]
+
+Traces are recorded with the axium.start_recording / axium.stop_recording
+services (or see tools/corpus/). Reports frames/sec, allocations per frame and
+the final per-zone state, so parser throughput regressions show up before
+deploying.
+"""
+from __future__ import annotations
+import argparse
+import glob
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+from bench_parser import load_axium_module  # noqa: E402
+
+replay_mod = load_axium_module("replay")
+state_mod = load_axium_module("state")
+
+_CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "*.jsonl")
+
+
+def _zones(spec: str) -> list[int]:
+    out: list[int] = []
+    for part in spec.split(","):
+        lo, _, hi = part.partition("-")
+        out.extend(range(int(lo), int(hi or lo) + 1))
+    return out
+
+
+def bench(entries: list[dict], zones: list[int], repeat: int):
+    # Throughput: fresh state per pass so every pass does the same work
+    frames = 0
+    seconds = 0.0
+    failures = 0
+    for _ in range(repeat):
+        stats = replay_mod.replay(entries, state_mod.AxiumState(zones))
+        frames += stats.frames
+        seconds += stats.seconds
+        failures += stats.parse_failures
+
+    # Allocations: blocks still alive after one traced pass, and the peak traced size
+    state = state_mod.AxiumState(zones)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    stats = replay_mod.replay(entries, state)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(d.count_diff for d in after.compare_to(before, "lineno") if d.count_diff > 0)
+    return frames, seconds, failures, stats.frames, allocated, peak, state
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay recorded Axium traces through the parser.")
+    ap.add_argument("traces", nargs="*", help="trace files (default: tools/corpus/*.jsonl)")
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--zones", default="1-8", help="configured zones, e.g. 1-8 or 1,2,5")
+    args = ap.parse_args(argv)
+
+    zones = _zones(args.zones)
+    for path in args.traces or sorted(glob.glob(_CORPUS)):
+        entries = replay_mod.load_trace(path)
+        frames, seconds, failures, one_pass, allocated, peak, state = bench(entries, zones, args.repeat)
+        print(f"== {path}")
+        print(f"entries: {len(entries)}  frames/pass: {one_pass}  parse failures: {failures // args.repeat}")
+        print(f"throughput: {frames / seconds:,.0f} frames/s over {args.repeat} passes")
+        print(f"allocations: {allocated / max(one_pass, 1):.2f} retained blocks/frame, peak {peak / 1024:.1f} KiB traced")
+        snap = state.snapshot()
+        print(f"final state (version {snap.version}):")
+        for z in zones:
+            r = snap.zone(z)
+            print(f"  zone {z:>2}: power={r.power} vol={r.volume} src={r.source} max={r.max_vol} name={r.name!r}")
+        if snap.source_names:
+            print(f"  sources: {dict(snap.source_names)}")
+        if snap.preset_names:
+            print(f"  presets: {dict(snap.preset_names)}")
+        if state.groups.members:
+            print(f"  groups: {state.groups.export()}")
+
+
+if __name__ == "__main__":
+    main()